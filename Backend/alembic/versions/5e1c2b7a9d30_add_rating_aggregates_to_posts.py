@@ -0,0 +1,37 @@
+"""Add rating aggregates to posts
+
+Revision ID: 5e1c2b7a9d30
+Revises: 0f0872a13a81
+Create Date: 2026-10-18 09:12:41.218304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e1c2b7a9d30'
+down_revision: Union[str, None] = '0f0872a13a81'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('posts', sa.Column('rating_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('posts', sa.Column('rating_sum', sa.Float(), server_default='0', nullable=False))
+
+    # Backfill de los agregados a partir de las calificaciones existentes
+    op.execute(
+        """
+        UPDATE posts SET
+            rating_count = (SELECT COUNT(*) FROM ratings WHERE ratings.post_id = posts.id),
+            rating_sum = (SELECT COALESCE(SUM(rating), 0) FROM ratings WHERE ratings.post_id = posts.id)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('posts', 'rating_sum')
+    op.drop_column('posts', 'rating_count')
@@ -0,0 +1,26 @@
+"""Add posts (created_at, id) index
+
+Revision ID: 8c4f0e2d6b17
+Revises: 5e1c2b7a9d30
+Create Date: 2026-10-18 10:03:17.642915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4f0e2d6b17'
+down_revision: Union[str, None] = '5e1c2b7a9d30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_posts_created_at_id', 'posts', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_posts_created_at_id', table_name='posts')
@@ -0,0 +1,29 @@
+"""Add ratings rated_at
+
+Revision ID: a4c9e2f7b813
+Revises: f3b8a1c6d245
+Create Date: 2026-10-18 15:48:33.904127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c9e2f7b813'
+down_revision: Union[str, None] = 'f3b8a1c6d245'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Las calificaciones existentes quedan sin fecha y no cuentan para la tendencia
+    op.add_column('ratings', sa.Column('rated_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_ratings_rated_at', 'ratings', ['rated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ratings_rated_at', table_name='ratings')
+    op.drop_column('ratings', 'rated_at')
@@ -0,0 +1,37 @@
+"""Add posts (author_id, is_published, created_at) index
+
+Revision ID: b3d97a51c2e8
+Revises: 8c4f0e2d6b17
+Create Date: 2026-10-18 10:41:55.108273
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d97a51c2e8'
+down_revision: Union[str, None] = '8c4f0e2d6b17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Los posts antiguos pueden tener is_published NULL; se tratan como borradores
+    op.execute("UPDATE posts SET is_published = false WHERE is_published IS NULL")
+    op.alter_column('posts', 'is_published',
+               existing_type=sa.Boolean(),
+               nullable=False,
+               server_default=sa.false())
+    op.create_index('ix_posts_author_published_created', 'posts',
+                    ['author_id', 'is_published', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_posts_author_published_created', table_name='posts')
+    op.alter_column('posts', 'is_published',
+               existing_type=sa.Boolean(),
+               nullable=True,
+               server_default=None)
@@ -0,0 +1,38 @@
+"""Add tags post_count
+
+Revision ID: b7e2d4f91c36
+Revises: a4c9e2f7b813
+Create Date: 2026-10-18 16:32:18.417093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2d4f91c36'
+down_revision: Union[str, None] = 'a4c9e2f7b813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tags', sa.Column('post_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill: posts publicados por etiqueta (la tabla tags es pequeña, una sola sentencia)
+    op.execute(
+        """
+        UPDATE tags SET post_count = (
+            SELECT COUNT(*)
+            FROM post_tags
+            JOIN posts ON posts.id = post_tags.post_id
+            WHERE post_tags.tag_id = tags.id AND posts.is_published
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('tags', 'post_count')
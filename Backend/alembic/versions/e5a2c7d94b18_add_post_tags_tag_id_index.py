@@ -0,0 +1,26 @@
+"""Add post_tags (tag_id, post_id) index
+
+Revision ID: e5a2c7d94b18
+Revises: d41e8b6f3a92
+Create Date: 2026-10-18 13:02:44.519870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a2c7d94b18'
+down_revision: Union[str, None] = 'd41e8b6f3a92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_post_tags_tag_id_post_id', 'post_tags', ['tag_id', 'post_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_post_tags_tag_id_post_id', table_name='post_tags')
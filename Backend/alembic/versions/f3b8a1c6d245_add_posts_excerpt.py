@@ -0,0 +1,49 @@
+"""Add posts excerpt
+
+Revision ID: f3b8a1c6d245
+Revises: e5a2c7d94b18
+Create Date: 2026-10-18 14:21:07.301562
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.models import make_excerpt
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b8a1c6d245'
+down_revision: Union[str, None] = 'e5a2c7d94b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    op.add_column('posts', sa.Column('excerpt', sa.String(), nullable=True))
+
+    # Backfill en Python: el HTML del contenido se limpia con la misma función que usa la app
+    connection = op.get_bind()
+    posts = sa.table('posts', sa.column('id', sa.Integer), sa.column('content', sa.String), sa.column('excerpt', sa.String))
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(posts.c.id, posts.c.content)
+            .where(posts.c.id > last_id)
+            .order_by(posts.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        connection.execute(
+            posts.update().where(posts.c.id == sa.bindparam('b_id')).values(excerpt=sa.bindparam('b_excerpt')),
+            [{'b_id': row.id, 'b_excerpt': make_excerpt(row.content)} for row in rows],
+        )
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    op.drop_column('posts', 'excerpt')
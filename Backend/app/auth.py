@@ -1,11 +1,14 @@
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
+import os
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.cache import TTLCache
 from app.database import get_db
 from app.models import User
 
@@ -15,40 +18,59 @@ SECRET_KEY = "your_secret_key_here"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30  # El token expirará en 30 minutos
 
-# Configurar el contexto de hash de contraseñas
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    """Retrieve the current authenticated user using the JWT token."""
-    credentials_exception = HTTPException(
+# Caché de identidades autenticadas, indexada por id de usuario
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+principal_cache = TTLCache(maxsize=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL)
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Identidad mínima del usuario autenticado; suficiente para las rutas que solo usan ``user.id``."""
+    id: int
+    username: str
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def _user_id_from_token(token: str) -> int:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: int = payload.get("sub")
+        user_id = payload.get("sub")
         if user_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
+            raise _credentials_exception()
+        return int(user_id)
+    except (JWTError, ValueError):
+        raise _credentials_exception()
+
+
+async def get_current_principal(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> Principal:
+    """Resolve the authenticated principal, hitting the users table only on a cache miss."""
+    user_id = _user_id_from_token(token)
+
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        row = (await db.execute(select(User.id, User.username).where(User.id == user_id))).first()
+        if row is None:
+            raise _credentials_exception()
+        principal = Principal(id=row.id, username=row.username)
+        principal_cache.set(user_id, principal)
 
-    # Fetch user from DB
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
-        raise credentials_exception
+    return principal
 
-    return user  # Returns the authenticated User object
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verifica si la contraseña ingresada es válida comparándola con su hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+def invalidate_principal(user_id: int) -> None:
+    """Descarta la identidad cacheada tras actualizar o eliminar al usuario."""
+    principal_cache.pop(user_id)
 
-def get_password_hash(password: str) -> str:
-    """Genera el hash de una contraseña."""
-    return pwd_context.hash(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Genera un token JWT con los datos del usuario y una fecha de expiración."""
@@ -0,0 +1,119 @@
+"""Carga masiva: array JSON o NDJSON (application/x-ndjson), una transacción por bloque.
+
+Las filas se validan una a una (las inválidas se informan con su índice y no detienen la
+carga) y las válidas se escriben en bloques de BULK_CHUNK_SIZE. Si la transacción de un
+bloque falla, el bloque se reintenta fila a fila para informar solo de las que fallan.
+"""
+import json
+import os
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Tuple, Type
+
+from fastapi import HTTPException, Request
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Filas por transacción en los endpoints de carga masiva
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "1000"))
+
+
+async def _iter_raw_rows(request: Request) -> AsyncIterator[Tuple[int, Any]]:
+    """Itera (índice, fila) de un array JSON o, con Content-Type NDJSON, línea a línea del stream."""
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type:
+        index, buffer = 0, b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield index, line
+                    index += 1
+        if buffer.strip():
+            yield index, buffer
+        return
+
+    try:
+        rows = await request.json()
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Request body must be a JSON array or NDJSON")
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=400, detail="Request body must be a JSON array or NDJSON")
+    for index, row in enumerate(rows):
+        yield index, row
+
+
+async def iter_validated_chunks(
+    request: Request,
+    schema: Type[BaseModel],
+    errors: List[dict],
+    chunk_size: int = BULK_CHUNK_SIZE,
+) -> AsyncIterator[List[Tuple[int, BaseModel]]]:
+    """Valida cada fila con ``schema`` y agrupa las válidas en bloques de ``chunk_size``.
+
+    Las filas inválidas no detienen la carga: se añaden a ``errors`` con su índice.
+    """
+    chunk = []
+    async for index, raw in _iter_raw_rows(request):
+        try:
+            if isinstance(raw, bytes):
+                item = schema.model_validate_json(raw)
+            else:
+                item = schema.model_validate(raw)
+        except ValidationError as exc:
+            errors.append({
+                "index": index,
+                "errors": exc.errors(include_url=False, include_context=False, include_input=False),
+            })
+            continue
+
+        chunk.append((index, item))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+Rows = List[Tuple[int, BaseModel]]
+
+
+def _row_failed(index: int, errors: List[dict], exc: Exception) -> None:
+    message = str(getattr(exc, "orig", None) or exc)
+    errors.append({"index": index, "errors": [{"msg": message}]})
+
+
+async def write_chunk(
+    db: AsyncSession,
+    chunk: Rows,
+    write: Callable[[Rows], Awaitable[Any]],
+    errors: List[dict],
+) -> List[Tuple[Rows, Any]]:
+    """Escribe ``chunk`` con ``write`` y confirma; devuelve los pares (filas, resultado) guardados.
+
+    Si el bloque falla (p. ej. un IntegrityError de una sola fila), se deshace y se
+    reintenta cada fila en su propia transacción: solo las filas que vuelven a fallar
+    se añaden a ``errors``.
+    """
+    try:
+        result = await write(chunk)
+        await db.commit()
+        return [(chunk, result)]
+    except SQLAlchemyError as exc:
+        await db.rollback()
+        if len(chunk) == 1:
+            _row_failed(chunk[0][0], errors, exc)
+            return []
+
+    written = []
+    for row in chunk:
+        try:
+            result = await write([row])
+            await db.commit()
+        except SQLAlchemyError as exc:
+            await db.rollback()
+            _row_failed(row[0], errors, exc)
+            continue
+        written.append(([row], result))
+    return written
@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+import os
+from typing import AsyncIterator
+
+from sqlalchemy import case, func, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.sql import Select
+
+from app.database import read_session
+from app.models import Post, Tag, User, post_tags
+
+# Filas leídas del cursor del servidor por cada bloque escrito en la respuesta
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+EXPORT_COLUMNS = [
+    "id", "title", "content", "is_published", "author_id", "author",
+    "created_at", "updated_at", "rating_count", "average_rating", "tags",
+]
+
+
+def _tag_names(dialect_name: str):
+    """Subconsulta correlacionada con los nombres de etiqueta del post separados por comas."""
+    if dialect_name == "postgresql":
+        names = func.string_agg(Tag.name, aggregate_order_by(literal_column("','"), Tag.name))
+    else:
+        names = func.group_concat(Tag.name, ",")
+    return (
+        select(names)
+        .select_from(post_tags.join(Tag, Tag.id == post_tags.c.tag_id))
+        .where(post_tags.c.post_id == Post.id)
+        .correlate(Post)
+        .scalar_subquery()
+    )
+
+
+def export_query(dialect_name: str, visible) -> Select:
+    """Una fila plana por post: el promedio sale de los agregados y las etiquetas de una subconsulta."""
+    return (
+        select(
+            Post.id, Post.title, Post.content, Post.is_published, Post.author_id,
+            User.username.label("author"), Post.created_at, Post.updated_at, Post.rating_count,
+            case((Post.rating_count > 0, Post.rating_sum / Post.rating_count)).label("average_rating"),
+            _tag_names(dialect_name).label("tags"),
+        )
+        .outerjoin(User, User.id == Post.author_id)
+        .where(visible)
+        .order_by(Post.id)
+    )
+
+
+def _ndjson_value(value):
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+def _format_ndjson(rows) -> str:
+    lines = []
+    for row in rows:
+        record = {key: _ndjson_value(value) for key, value in row._mapping.items()}
+        record["tags"] = record["tags"].split(",") if record["tags"] else []
+        lines.append(json.dumps(record, ensure_ascii=False))
+    return "\n".join(lines) + "\n"
+
+
+def _format_csv(rows, header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+async def stream_export(statement: Select, export_format: str) -> AsyncIterator[bytes]:
+    """Recorre ``statement`` con un cursor del servidor, un bloque de filas a la vez.
+
+    Abre su propia sesión: la de la dependencia ``get_db`` puede cerrarse antes de
+    que termine de enviarse el StreamingResponse.
+    """
+    if export_format == "csv":
+        yield _format_csv([], header=True).encode()
+
+    async with read_session() as db:
+        result = await db.stream(statement)
+        async for rows in result.partitions(EXPORT_BATCH_SIZE):
+            if export_format == "csv":
+                yield _format_csv(rows).encode()
+            else:
+                yield _format_ndjson(rows).encode()
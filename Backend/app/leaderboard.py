@@ -0,0 +1,311 @@
+"""Rankings precalculados en memoria: mejor valorados y tendencia.
+
+- ``top_rated``: media bayesiana ``(C * m + suma) / (C + n)``, con ``m`` la media global y
+  ``C`` = LEADERBOARD_PRIOR_WEIGHT; un post con pocas calificaciones no supera a uno
+  con muchas solo por tener un único 5.
+- ``trending``: suma de las calificaciones de la ventana LEADERBOARD_TRENDING_DAYS con
+  decaimiento exponencial (vida media LEADERBOARD_HALF_LIFE_HOURS). Se usa "forward
+  decay": cada calificación aporta ``valor * 2^((t - t0) / vida_media)``, así sumar una
+  calificación nueva no obliga a recalcular las demás.
+
+``rate_post`` actualiza ambos rankings de forma incremental; una tarea periódica los
+reconstruye desde la base de datos (posts publicados/borrados, cargas masivas, caducidad
+de la ventana y nuevo ``t0``). El refresco pide a SQL solo los mejores candidatos
+(ORDER BY ... LIMIT), así que en *trending* un post que estaba fuera de ellos suma sus
+calificaciones nuevas desde cero hasta el siguiente refresco.
+"""
+import asyncio
+import bisect
+import heapq
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func, select
+
+from app.database import read_session
+from app.models import Post, Rating
+
+LEADERBOARD_SIZE = int(os.getenv("LEADERBOARD_SIZE", "100"))
+LEADERBOARD_REFRESH_SECONDS = float(os.getenv("LEADERBOARD_REFRESH_SECONDS", "300"))
+LEADERBOARD_PRIOR_WEIGHT = float(os.getenv("LEADERBOARD_PRIOR_WEIGHT", "10"))
+LEADERBOARD_TRENDING_DAYS = float(os.getenv("LEADERBOARD_TRENDING_DAYS", "7"))
+LEADERBOARD_HALF_LIFE_HOURS = float(os.getenv("LEADERBOARD_HALF_LIFE_HOURS", "24"))
+
+# Espera antes de reintentar una primera carga fallida desde las peticiones
+LOAD_RETRY_SECONDS = 30
+
+logger = logging.getLogger(__name__)
+
+
+class Leaderboard:
+    """Puntuaciones conocidas (candidatos del último refresco y posts calificados desde
+    entonces) y los mejores ``capacity`` ordenados.
+
+    Se guardan el doble de candidatos de los que se sirven para que bajar la
+    puntuación de uno de ellos rara vez obligue a reconstruir desde ``scores``.
+    """
+
+    def __init__(self, size: int = LEADERBOARD_SIZE):
+        self.size = size
+        self.capacity = size * 2
+        self.scores: Dict[int, float] = {}
+        self._top: List[Tuple[float, int]] = []  # (-score, post_id), ascendente
+        self._members: Dict[int, float] = {}
+        self._stale = False
+
+    def replace(self, scores: Dict[int, float]):
+        self.scores = scores
+        self._rebuild()
+
+    def _rebuild(self):
+        best = heapq.nlargest(self.capacity, self.scores.items(), key=lambda item: item[1])
+        self._top = sorted((-score, post_id) for post_id, score in best)
+        self._members = {post_id: score for post_id, score in best}
+        self._stale = False
+
+    def update(self, post_id: int, score: Optional[float]):
+        """Nueva puntuación de un post (``None`` lo quita del ranking)."""
+        if post_id in self._members:
+            old = self._members.pop(post_id)
+            del self._top[bisect.bisect_left(self._top, (-old, post_id))]
+        if score is None:
+            self.scores.pop(post_id, None)
+        else:
+            self.scores[post_id] = score
+            full = len(self._top) >= self.capacity
+            if not full or (-score, post_id) < self._top[-1]:
+                bisect.insort(self._top, (-score, post_id))
+                self._members[post_id] = score
+                if len(self._top) > self.capacity:
+                    _, evicted = self._top.pop()
+                    del self._members[evicted]
+        # Si faltan candidatos, algún post fuera de la lista podría merecer entrar
+        if len(self._top) < min(self.size, len(self.scores)):
+            self._stale = True
+
+    def top(self, limit: int) -> List[Tuple[int, float]]:
+        if self._stale:
+            self._rebuild()
+        return [(post_id, -negative) for negative, post_id in self._top[:limit]]
+
+    def __len__(self):
+        return len(self.scores)
+
+
+top_rated = Leaderboard()
+trending = Leaderboard()
+
+
+class _State:
+    def __init__(self):
+        self.global_mean = 0.0
+        self.trending_t0 = time.time()
+        self.refreshed_at: Optional[float] = None
+        self.refresh_seconds = 0.0
+        self.failed_at: Optional[float] = None
+        self.refresh_lock: Optional[asyncio.Lock] = None
+        # Posts calificados/quitados mientras un refresco consulta la base de datos
+        self.touched: Optional[Set[int]] = None
+
+
+state = _State()
+
+
+def bayesian_score(rating_count: int, rating_sum: float) -> float:
+    return (LEADERBOARD_PRIOR_WEIGHT * state.global_mean + rating_sum) / (LEADERBOARD_PRIOR_WEIGHT + rating_count)
+
+
+def _decay_weight(rated_at: datetime) -> float:
+    # rated_at se guarda en UTC sin zona horaria (datetime.utcnow)
+    age_hours = (rated_at - datetime.utcfromtimestamp(state.trending_t0)).total_seconds() / 3600
+    return 2 ** (age_hours / LEADERBOARD_HALF_LIFE_HOURS)
+
+
+def trending_score_to_now(score: float) -> float:
+    """Puntuación forward-decay expresada en "calificaciones de ahora" (solo para mostrar)."""
+    return score / 2 ** ((time.time() - state.trending_t0) / 3600 / LEADERBOARD_HALF_LIFE_HOURS)
+
+
+def record_rating(
+    post_id: int,
+    is_published: bool,
+    rating_count: int,
+    rating_sum: float,
+    rating: float,
+    rated_at: datetime,
+    previous: Optional[float] = None,
+    previous_rated_at: Optional[datetime] = None,
+):
+    """Actualización incremental tras ``rate_post`` (agregados del post ya actualizados)."""
+    if not is_published:
+        return
+    if state.touched is not None:
+        state.touched.add(post_id)
+    top_rated.update(post_id, bayesian_score(rating_count, rating_sum))
+
+    score = trending.scores.get(post_id, 0.0) + rating * _decay_weight(rated_at)
+    window_start = datetime.utcnow() - timedelta(days=LEADERBOARD_TRENDING_DAYS)
+    if previous is not None and previous_rated_at is not None and previous_rated_at >= window_start:
+        score -= previous * _decay_weight(previous_rated_at)
+    trending.update(post_id, score)
+
+
+def forget_post(post_id: int):
+    """Quita un post despublicado o borrado sin esperar al siguiente refresco."""
+    if state.touched is not None:
+        state.touched.add(post_id)
+    top_rated.update(post_id, None)
+    trending.update(post_id, None)
+
+
+def _hours_since(db, column, origin: datetime):
+    """Horas (con signo) entre ``origin`` y una columna DateTime, según el dialecto."""
+    if db.bind.dialect.name == "sqlite":
+        return (func.julianday(column) - func.julianday(origin)) * 24
+    return func.extract("epoch", column - origin) / 3600
+
+
+def _published_rated():
+    return (Post.is_published == True, Post.rating_count > 0)  # noqa: E712
+
+
+def _bayesian_expression(global_mean: float):
+    return (LEADERBOARD_PRIOR_WEIGHT * global_mean + Post.rating_sum) / (
+        LEADERBOARD_PRIOR_WEIGHT + Post.rating_count
+    )
+
+
+def _trending_query(db, t0: float):
+    """Suma con decaimiento (mismo peso que _decay_weight) de la ventana, por post publicado."""
+    window_start = datetime.utcnow() - timedelta(days=LEADERBOARD_TRENDING_DAYS)
+    # En SQLite power() la registra app.database en cada conexión
+    weighted = func.sum(Rating.rating * func.power(
+        2.0, _hours_since(db, Rating.rated_at, datetime.utcfromtimestamp(t0)) / LEADERBOARD_HALF_LIFE_HOURS
+    ))
+    query = (
+        select(Rating.post_id, weighted.label("score"))
+        .join(Post, Post.id == Rating.post_id)
+        .where(Post.is_published == True, Rating.rated_at >= window_start)  # noqa: E712
+        .group_by(Rating.post_id)
+    )
+    return query, weighted
+
+
+async def _rescore(db, post_ids: Iterable[int]):
+    """Puntuaciones exactas de unos pocos posts (los tocados durante el refresco)."""
+    post_ids = list(post_ids)
+    bayesian = _bayesian_expression(state.global_mean)
+    result = await db.execute(
+        select(Post.id, bayesian).where(Post.id.in_(post_ids), *_published_rated())
+    )
+    top_scores = dict(result.all())
+    query, _ = _trending_query(db, state.trending_t0)
+    trending_scores = dict((await db.execute(query.where(Rating.post_id.in_(post_ids)))).all())
+    for post_id in post_ids:
+        top_rated.update(post_id, top_scores.get(post_id))
+        trending.update(post_id, trending_scores.get(post_id))
+
+
+async def _refresh():
+    start = time.perf_counter()
+    t0 = time.time()
+    state.touched = set()
+    try:
+        async with read_session() as db:
+            total_count, total_sum = (await db.execute(
+                select(func.sum(Post.rating_count), func.sum(Post.rating_sum)).where(*_published_rated())
+            )).one()
+            global_mean = (total_sum or 0.0) / total_count if total_count else 0.0
+
+            # Solo los ``capacity`` mejores de cada ranking salen de la base de datos
+            bayesian = _bayesian_expression(global_mean)
+            result = await db.execute(
+                select(Post.id, bayesian.label("score"))
+                .where(*_published_rated())
+                .order_by(bayesian.desc(), Post.id)
+                .limit(top_rated.capacity)
+            )
+            top_scores = dict(result.all())
+
+            query, weighted = _trending_query(db, t0)
+            result = await db.execute(
+                query.order_by(weighted.desc(), Rating.post_id).limit(trending.capacity)
+            )
+            trending_scores = dict(result.all())
+
+            # Todo a la vez (sin await entre medias): media, t0 y rankings quedan coherentes
+            state.global_mean = global_mean
+            state.trending_t0 = t0
+            top_rated.replace(top_scores)
+            trending.replace(trending_scores)
+
+            # Lo calificado durante las consultas se aplicó a los rankings viejos (y con el
+            # t0 anterior): se recalcula desde la base de datos. Las calificaciones que llegan
+            # mientras tanto ya usan el t0 nuevo y se repasan en la vuelta siguiente.
+            for _ in range(3):
+                touched, state.touched = state.touched, set()
+                if not touched:
+                    break
+                await _rescore(db, touched)
+    finally:
+        state.touched = None
+
+    state.refreshed_at = time.time()
+    state.failed_at = None
+    state.refresh_seconds = time.perf_counter() - start
+
+
+def _refresh_lock() -> asyncio.Lock:
+    # Se crea dentro del bucle de eventos (en Python 3.9 un Lock queda ligado al bucle actual)
+    if state.refresh_lock is None:
+        state.refresh_lock = asyncio.Lock()
+    return state.refresh_lock
+
+
+async def refresh():
+    """Reconstruye ambos rankings desde la base de datos (un solo refresco a la vez)."""
+    async with _refresh_lock():
+        await _refresh()
+
+
+async def ensure_loaded():
+    """Primera carga bajo demanda. Si falla se sirven rankings vacíos (con el error en el
+    log) y no se reintenta en cada petición, sino pasados LOAD_RETRY_SECONDS."""
+    if state.refreshed_at is not None or _recently_failed():
+        return
+    async with _refresh_lock():
+        # Las peticiones que esperaban al primer refresco no lo repiten
+        if state.refreshed_at is not None or _recently_failed():
+            return
+        try:
+            await _refresh()
+        except Exception:
+            state.failed_at = time.time()
+            logger.exception("Leaderboard load failed; serving empty rankings")
+
+
+def _recently_failed() -> bool:
+    return state.failed_at is not None and time.time() - state.failed_at < LOAD_RETRY_SECONDS
+
+
+async def refresh_periodically():
+    """Tarea de fondo iniciada al arrancar la app (ver app/main.py)."""
+    while True:
+        try:
+            await refresh()
+        except Exception:
+            logger.exception("Leaderboard refresh failed")
+        await asyncio.sleep(LEADERBOARD_REFRESH_SECONDS)
+
+
+def leaderboard_status() -> dict:
+    return {
+        "top_rated_posts": len(top_rated),
+        "trending_posts": len(trending),
+        "global_mean": round(state.global_mean, 4),
+        "refreshed_seconds_ago": round(time.time() - state.refreshed_at, 1) if state.refreshed_at else None,
+        "last_refresh_ms": round(state.refresh_seconds * 1000, 1),
+    }
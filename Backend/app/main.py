@@ -1,15 +1,24 @@
+import asyncio
+import contextlib
+
 from fastapi import FastAPI
 from app.routes.users import router as users_router
 from app.routes.posts import router as posts_router
 from app.routes.tags import router as tags_router
 from app.routes.ratings import router as ratings_router  # 🔹 Corrige el nombre aquí
 from app.routes.auth import router as auth_router  # 🔹 Agrega la ruta de autenticación
+from app.routes.stats import router as stats_router
+from app.routes.metrics import router as metrics_router
 from fastapi.middleware.cors import CORSMiddleware
+from app.serialization import FastJSONResponse
+from app.metrics import METRICS_ENABLED, MetricsMiddleware
+from app import leaderboard, profiler
 
 app = FastAPI(
     title="Blog API",
     description="API para gestionar usuarios, publicaciones y etiquetas.",
     version="1.0.0",
+    default_response_class=FastJSONResponse,
 )
 
 # Configuración de CORS
@@ -39,6 +48,30 @@ app.include_router(users_router, prefix="/users", tags=["Users"])
 app.include_router(posts_router, prefix="/posts", tags=["Posts"])
 app.include_router(tags_router, prefix="/tags", tags=["Tags"])
 app.include_router(ratings_router, prefix="/ratings", tags=["Ratings"])
+app.include_router(stats_router, prefix="/stats", tags=["Stats"])
+app.include_router(metrics_router)
+
+# Métricas por ruta para Prometheus; se registra al final para medir también CORS
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Perfilador de SQL opcional (SQL_PROFILER=log|dev, ver app/profiler.py)
+if profiler.SQL_PROFILER in ("log", "dev"):
+    profiler.install()  # todos los motores: primario y réplicas de lectura
+    app.add_middleware(profiler.ProfilerMiddleware, headers=profiler.SQL_PROFILER == "dev")
+
+# Rankings de posts (top/trending): se reconstruyen en segundo plano cada LEADERBOARD_REFRESH_SECONDS
+@app.on_event("startup")
+async def start_leaderboard_refresh():
+    app.state.leaderboard_task = asyncio.create_task(leaderboard.refresh_periodically())
+
+@app.on_event("shutdown")
+async def stop_leaderboard_refresh():
+    task = getattr(app.state, "leaderboard_task", None)
+    if task is not None:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
 
 @app.get("/")
 def read_root():
@@ -0,0 +1,184 @@
+import bisect
+import contextvars
+import os
+import time
+from typing import Dict, List, Tuple
+
+from sqlalchemy import event
+
+from app.database import async_engine, pool_status, read_replicas
+
+# Métricas por ruta en formato de texto de Prometheus (GET /metrics)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Tiempo de base de datos acumulado por la petición en curso. Se guarda una lista
+# (mutable) para que las sumas hechas dentro del greenlet de SQLAlchemy sean visibles
+# aunque este trabaje sobre una copia del contexto.
+_db_time: contextvars.ContextVar = contextvars.ContextVar("request_db_time", default=None)
+
+
+class _Series:
+    __slots__ = ("count", "latency_sum", "buckets", "response_bytes", "db_seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.latency_sum = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)  # el último es +Inf
+        self.response_bytes = 0
+        self.db_seconds = 0.0
+
+
+class MetricsRegistry:
+    """Contadores en memoria del proceso; se agregan entre réplicas desde Prometheus."""
+
+    def __init__(self):
+        self.series: Dict[Tuple[str, str, int], _Series] = {}
+        self.in_flight = 0
+
+    def observe(self, method: str, route: str, status: int, latency: float, response_bytes: int, db_seconds: float):
+        key = (method, route, status)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = _Series()
+        series.count += 1
+        series.latency_sum += latency
+        series.buckets[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+        series.response_bytes += response_bytes
+        series.db_seconds += db_seconds
+
+    def clear(self):
+        self.series.clear()
+
+
+registry = MetricsRegistry()
+
+
+def route_template(scope) -> str:
+    """Plantilla de la ruta (/posts/posts/{id}), no la URL concreta, para acotar la cardinalidad."""
+    endpoint = scope.get("endpoint")
+    app = scope.get("app")
+    if endpoint is None or app is None:
+        return "unmatched"
+    templates = getattr(app.state, "metrics_route_templates", None)
+    if templates is None:
+        templates = {
+            (getattr(route, "endpoint", None), method): route.path
+            for route in app.routes
+            for method in (getattr(route, "methods", None) or ("",))
+        }
+        app.state.metrics_route_templates = templates
+    return templates.get((endpoint, scope["method"])) or templates.get((endpoint, ""), "unmatched")
+
+
+class MetricsMiddleware:
+    """Middleware ASGI puro (sin BaseHTTPMiddleware) que mide cada petición HTTP."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+        response_bytes = 0
+        db_time = [0.0]
+        token = _db_time.set(db_time)
+        registry.in_flight += 1
+
+        async def send_with_metrics(message):
+            nonlocal status, response_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            registry.in_flight -= 1
+            _db_time.reset(token)
+            registry.observe(
+                scope["method"], route_template(scope), status,
+                time.perf_counter() - start, response_bytes, db_time[0],
+            )
+
+
+def _db_start(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_start = time.perf_counter()
+
+
+def _db_end(conn, cursor, statement, parameters, context, executemany):
+    db_time = _db_time.get()
+    if db_time is not None:
+        db_time[0] += time.perf_counter() - context._metrics_start
+
+
+# Primario y réplicas de lectura cuentan igual en el tiempo de base de datos de la petición
+for _engine in (async_engine, *read_replicas.engines):
+    event.listen(_engine.sync_engine, "before_cursor_execute", _db_start)
+    event.listen(_engine.sync_engine, "after_cursor_execute", _db_end)
+
+
+def _labels(**labels) -> str:
+    return ",".join(f'{key}="{value}"' for key, value in labels.items())
+
+
+def render_metrics() -> str:
+    """Exposición en formato de texto de Prometheus (versión 0.0.4)."""
+    lines: List[str] = [
+        "# HELP http_requests_total Peticiones HTTP por ruta y estado.",
+        "# TYPE http_requests_total counter",
+    ]
+    items = sorted(registry.series.items())
+    for (method, route, status), series in items:
+        lines.append(f"http_requests_total{{{_labels(method=method, route=route, status=status)}}} {series.count}")
+
+    lines += [
+        "# HELP http_request_duration_seconds Latencia de las peticiones HTTP.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for (method, route, status), series in items:
+        labels = _labels(method=method, route=route, status=status)
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), series.buckets):
+            cumulative += count
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f"http_request_duration_seconds_sum{{{labels}}} {series.latency_sum:.6f}")
+        lines.append(f"http_request_duration_seconds_count{{{labels}}} {series.count}")
+
+    lines += [
+        "# HELP http_response_size_bytes_total Bytes enviados en el cuerpo de las respuestas.",
+        "# TYPE http_response_size_bytes_total counter",
+    ]
+    for (method, route, status), series in items:
+        labels = _labels(method=method, route=route, status=status)
+        lines.append(f"http_response_size_bytes_total{{{labels}}} {series.response_bytes}")
+
+    lines += [
+        "# HELP http_request_db_seconds_total Tiempo en la base de datos de las peticiones.",
+        "# TYPE http_request_db_seconds_total counter",
+    ]
+    for (method, route, status), series in items:
+        labels = _labels(method=method, route=route, status=status)
+        lines.append(f"http_request_db_seconds_total{{{labels}}} {series.db_seconds:.6f}")
+
+    lines += [
+        "# HELP http_requests_in_flight Peticiones HTTP en curso.",
+        "# TYPE http_requests_in_flight gauge",
+        f"http_requests_in_flight {registry.in_flight}",
+    ]
+
+    pool = pool_status()
+    for name in ("size", "checked_out", "overflow", "checkouts", "timeouts"):
+        if name in pool:
+            metric_type = "counter" if name in ("checkouts", "timeouts") else "gauge"
+            metric = f"db_pool_{name}_total" if metric_type == "counter" else f"db_pool_{name}"
+            lines += [f"# TYPE {metric} {metric_type}", f"{metric} {pool[name]}"]
+
+    return "\n".join(lines) + "\n"
@@ -1,17 +1,39 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Table, Float, UniqueConstraint, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Table, Float, UniqueConstraint, Boolean, Index
+from sqlalchemy import DDL, bindparam, event, inspect, false
+from sqlalchemy.orm import Session, relationship, column_property
+from sqlalchemy.orm.util import identity_key
 from datetime import datetime
 from app.database import Base
+import html
+import re
+
+# Longitud del resumen guardado en posts.excerpt (vista summary de los listados)
+EXCERPT_LENGTH = 200
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def make_excerpt(content, length: int = EXCERPT_LENGTH) -> str:
+    """Texto plano (sin HTML) de los primeros ``length`` caracteres del contenido, cortado en una palabra."""
+    text = _SPACE_RE.sub(" ", html.unescape(_TAG_RE.sub(" ", content or ""))).strip()
+    if len(text) <= length:
+        return text
+    return text[:length].rsplit(" ", 1)[0].rstrip(" ,.;:") + "…"
 
 class Rating(Base):
     __tablename__ = "ratings"
     id = Column(Integer, primary_key=True, index=True)
     post_id = Column(Integer, ForeignKey("posts.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    rating = Column(Float, nullable=False)
+    # active_history para conocer el valor anterior al actualizar los agregados del post
+    rating = column_property(Column(Float, nullable=False), active_history=True)
+    # Última vez que el usuario calificó el post (ventana de tendencia, ver app/leaderboard.py)
+    rated_at = Column(DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     __table_args__ = (
         UniqueConstraint("post_id", "user_id", name="unique_post_user_rating"),
+        Index("ix_ratings_rated_at", "rated_at"),
     )
 
     post = relationship("Post", back_populates="ratings")
@@ -23,6 +45,8 @@ post_tags = Table(
     Base.metadata,
     Column("post_id", Integer, ForeignKey("posts.id"), primary_key=True),
     Column("tag_id", Integer, ForeignKey("tags.id"), primary_key=True),
+    # La PK (post_id, tag_id) no sirve para buscar por etiqueta
+    Index("ix_post_tags_tag_id_post_id", "tag_id", "post_id"),
 )
 
 class User(Base):
@@ -44,24 +68,197 @@ class User(Base):
 
 class Post(Base):
     __tablename__ = "posts"
+    __table_args__ = (
+        # Orden y paginación por cursor del listado de posts
+        Index("ix_posts_created_at_id", "created_at", "id"),
+        # Filtros por autor / publicado (p. ej. borradores del usuario)
+        Index("ix_posts_author_published_created", "author_id", "is_published", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
     content = Column(String, nullable=False)
-    is_published = Column(Boolean, default=False)
+    is_published = Column(Boolean, nullable=False, default=False, server_default=false())
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, nullable=True)
 
+    # Agregados de calificaciones mantenidos de forma incremental (ver eventos de Rating)
+    rating_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_sum = Column(Float, nullable=False, default=0.0, server_default="0")
+
+    # Resumen en texto plano mantenido al escribir (ver make_excerpt y eventos de Post)
+    excerpt = Column(String, nullable=True)
+
     author_id = Column(Integer, ForeignKey("users.id"))
     author = relationship("User", back_populates="posts")
 
     tags = relationship("Tag", secondary=post_tags, back_populates="posts")
     ratings = relationship("Rating", back_populates="post", cascade="all, delete-orphan")
 
+    @property
+    def average_rating(self) -> float:
+        if not self.rating_count:
+            return 0.0
+        return self.rating_sum / self.rating_count
+
+# Búsqueda de texto completo sobre título y contenido (ver app/search.py).
+# PostgreSQL: columna tsvector generada (se mantiene sola en INSERT/UPDATE) con índice GIN.
+# No se mapea en el modelo para no leerla en cada consulta de posts.
+POSTS_SEARCH_DDL_POSTGRESQL = [
+    """
+    ALTER TABLE posts ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(content, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX ix_posts_search_vector ON posts USING GIN (search_vector)",
+]
+
+# SQLite: tabla FTS5 de contenido externo sincronizada con triggers (pruebas y desarrollo local)
+POSTS_SEARCH_DDL_SQLITE = [
+    "CREATE VIRTUAL TABLE posts_fts USING fts5(title, content, content='posts', content_rowid='id')",
+    """
+    CREATE TRIGGER posts_fts_ai AFTER INSERT ON posts BEGIN
+        INSERT INTO posts_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER posts_fts_ad AFTER DELETE ON posts BEGIN
+        INSERT INTO posts_fts(posts_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER posts_fts_au AFTER UPDATE OF title, content ON posts BEGIN
+        INSERT INTO posts_fts(posts_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO posts_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+]
+
+for _statement in POSTS_SEARCH_DDL_POSTGRESQL:
+    event.listen(Post.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+for _statement in POSTS_SEARCH_DDL_SQLITE:
+    event.listen(Post.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+
+@event.listens_for(Post, "before_insert")
+@event.listens_for(Post, "before_update")
+def _refresh_excerpt(mapper, connection, target):
+    if target.excerpt is None or inspect(target).attrs.content.history.has_changes():
+        target.excerpt = make_excerpt(target.content)
+
 class Tag(Base):
     __tablename__ = "tags"
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True, nullable=False)
+    # Posts publicados con esta etiqueta (ver eventos de sesión más abajo y /tags/stats)
+    post_count = Column(Integer, nullable=False, default=0, server_default="0")
 
     posts = relationship("Post", secondary=post_tags, back_populates="tags")
+
+
+# Mantener rating_count y rating_sum dentro de la misma transacción que modifica la calificación
+def _apply_rating_delta(connection, post_id, count_delta, sum_delta):
+    posts = Post.__table__
+    connection.execute(
+        posts.update()
+        .where(posts.c.id == post_id)
+        .values(
+            rating_count=posts.c.rating_count + count_delta,
+            rating_sum=posts.c.rating_sum + sum_delta,
+        )
+    )
+
+@event.listens_for(Rating, "after_insert")
+def _rating_inserted(mapper, connection, target):
+    _apply_rating_delta(connection, target.post_id, 1, target.rating)
+
+@event.listens_for(Rating, "after_update")
+def _rating_updated(mapper, connection, target):
+    history = inspect(target).attrs.rating.history
+    if history.deleted and history.added:
+        _apply_rating_delta(connection, target.post_id, 0, history.added[0] - history.deleted[0])
+
+@event.listens_for(Rating, "after_delete")
+def _rating_deleted(mapper, connection, target):
+    # Al borrar un usuario se borran todas sus calificaciones: los deltas se acumulan por
+    # post y se aplican en un solo executemany al final del flush (ver _apply_deleted_ratings)
+    session = inspect(target).session
+    post = session.identity_map.get(identity_key(Post, target.post_id)) if session is not None else None
+    if post is not None and post in session.deleted:
+        return  # el post también se borra: no hay agregados que mantener
+    if session is None:
+        _apply_rating_delta(connection, target.post_id, -1, -target.rating)
+        return
+    deltas = session.info.setdefault("deleted_rating_deltas", {})
+    count, total = deltas.get(target.post_id, (0, 0.0))
+    deltas[target.post_id] = (count - 1, total - target.rating)
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_deleted_ratings(session, flush_context):
+    deltas = session.info.pop("deleted_rating_deltas", None)
+    if not deltas:
+        return
+    posts = Post.__table__
+    session.connection().execute(
+        posts.update()
+        .where(posts.c.id == bindparam("b_post_id"))
+        .values(
+            rating_count=posts.c.rating_count + bindparam("b_count"),
+            rating_sum=posts.c.rating_sum + bindparam("b_sum"),
+        ),
+        [{"b_post_id": post_id, "b_count": count, "b_sum": total} for post_id, (count, total) in deltas.items()],
+    )
+
+
+# Contador tags.post_count: solo cuentan los posts publicados. Las escrituras del ORM
+# (crear, editar etiquetas, publicar/despublicar, borrar) se resuelven con los eventos de
+# sesión; las cargas con Core (bulk, seed) aplican tag_post_count_update por su cuenta.
+tag_post_count_update = (
+    Tag.__table__.update()
+    .where(Tag.__table__.c.id == bindparam("b_tag_id"))
+    .values(post_count=Tag.__table__.c.post_count + bindparam("b_delta"))
+)
+
+
+def tag_count_params(deltas: dict) -> list:
+    """Parámetros de tag_post_count_update (executemany) para {tag_id: delta}."""
+    return [{"b_tag_id": tag_id, "b_delta": delta} for tag_id, delta in deltas.items() if delta]
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_tag_count_deltas(session, flush_context, instances):
+    # Se guardan objetos Tag (no ids): una etiqueta nueva aún no tiene id antes del flush
+    deltas = session.info["tag_count_deltas"] = {}
+    for post in (*session.new, *session.dirty, *session.deleted):
+        if not isinstance(post, Post):
+            continue
+        state = inspect(post)
+        is_new, is_deleted = post in session.new, post in session.deleted
+        published = state.attrs.is_published.history
+        if not (is_new or is_deleted or published.has_changes() or state.attrs.tags.history.has_changes()):
+            continue
+
+        tags = state.attrs.tags.load_history()
+        if is_new:
+            was_published = False
+        else:
+            was_published = bool(published.deleted[0] if published.deleted else post.is_published)
+        now_published = not is_deleted and bool(post.is_published)
+
+        before = set(tags.unchanged) | set(tags.deleted) if was_published else set()
+        after = set(tags.unchanged) | set(tags.added) if now_published else set()
+        for tag in before - after:
+            deltas[tag] = deltas.get(tag, 0) - 1
+        for tag in after - before:
+            deltas[tag] = deltas.get(tag, 0) + 1
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_tag_count_deltas(session, flush_context):
+    deltas = session.info.pop("tag_count_deltas", None)
+    params = tag_count_params({tag.id: delta for tag, delta in (deltas or {}).items()})
+    if params:
+        session.connection().execute(tag_post_count_update, params)
+
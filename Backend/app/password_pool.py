@@ -0,0 +1,51 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from fastapi import HTTPException, status
+
+# bcrypt libera el GIL, así que un pool de hilos basta para sacarlo del event loop.
+# El número de hilos limita la CPU dedicada a hashing; MAX_PENDING limita la cola.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+
+
+class PasswordPoolStats:
+    def __init__(self):
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+
+pool_stats = PasswordPoolStats()
+
+
+async def run_password_task(func: Callable[..., Any], *args: Any) -> Any:
+    """Ejecuta una operación bcrypt en el pool acotado; responde 503 si la cola está llena."""
+    if pool_stats.pending >= PASSWORD_HASH_MAX_PENDING:
+        pool_stats.rejected += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication service is busy, please retry",
+            headers={"Retry-After": "1"},
+        )
+
+    pool_stats.pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, func, *args)
+    finally:
+        pool_stats.pending -= 1
+        pool_stats.completed += 1
+
+
+def password_pool_status() -> dict:
+    return {
+        "workers": PASSWORD_HASH_WORKERS,
+        "max_pending": PASSWORD_HASH_MAX_PENDING,
+        "pending": pool_stats.pending,
+        "completed": pool_stats.completed,
+        "rejected": pool_stats.rejected,
+    }
@@ -0,0 +1,98 @@
+"""Servicio único de hashing de contraseñas (bcrypt).
+
+El coste se configura con PASSWORD_BCRYPT_ROUNDS (cada ronda más duplica el tiempo de
+CPU). Los hashes guardados con otro coste se rehacen en el siguiente login correcto
+(``verify_and_update``), así que cambiar el valor no requiere migración.
+
+Las funciones son síncronas y bloqueantes: desde las rutas se ejecutan en el pool
+acotado de ``app.password_pool.run_password_task``.
+
+Calibración (en la CPU del despliegue, desde Backend/):
+    python -m app.passwords --target-ms 250
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+PASSWORD_BCRYPT_ROUNDS = int(os.getenv("PASSWORD_BCRYPT_ROUNDS", "12"))
+
+# bcrypt acepta de 4 a 31 rondas; por debajo de 10 no se recomienda en producción
+MIN_BCRYPT_ROUNDS = 4
+MAX_BCRYPT_ROUNDS = 31
+RECOMMENDED_MIN_ROUNDS = 10
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=PASSWORD_BCRYPT_ROUNDS)
+
+
+class PasswordStats:
+    """Hashes reescritos en el login; lo incrementa la ruta tras confirmar el commit."""
+
+    def __init__(self):
+        self.rehashed = 0
+
+
+password_stats = PasswordStats()
+
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def verify_and_update(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verifica la contraseña y, si el hash usa otro coste, devuelve también el hash nuevo."""
+    return pwd_context.verify_and_update(password, hashed_password)
+
+
+def password_hashing_status() -> dict:
+    return {"bcrypt_rounds": PASSWORD_BCRYPT_ROUNDS, "rehashed_on_login": password_stats.rehashed}
+
+
+def measure(rounds: int, samples: int = 5) -> float:
+    """Mediana en milisegundos de un hash bcrypt con ``rounds`` rondas."""
+    context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        context.hash("calibration-password")
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate(target_ms: float, samples: int = 5, min_rounds: int = RECOMMENDED_MIN_ROUNDS) -> dict:
+    """Mayor número de rondas cuyo hash tarda como mucho ``target_ms`` (nunca menos de ``min_rounds``)."""
+    timings = {}
+    chosen = min_rounds
+    for rounds in range(MIN_BCRYPT_ROUNDS, MAX_BCRYPT_ROUNDS + 1):
+        elapsed = measure(rounds, samples)
+        timings[rounds] = round(elapsed, 1)
+        if elapsed > target_ms:
+            break
+        chosen = max(chosen, rounds)
+    return {
+        "rounds": chosen,
+        "target_ms": target_ms,
+        "timings_ms": timings,
+        # Un hilo del pool de hashing resuelve ~1000 / ms logins por segundo
+        "logins_per_second_per_worker": round(1000 / measure(chosen, samples), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibra PASSWORD_BCRYPT_ROUNDS para una latencia objetivo")
+    parser.add_argument("--target-ms", type=float, default=250, help="Tiempo máximo de un hash/verificación")
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--min-rounds", type=int, default=RECOMMENDED_MIN_ROUNDS)
+    args = parser.parse_args()
+
+    result = calibrate(args.target_ms, args.samples, args.min_rounds)
+    print(json.dumps(result, indent=2))
+    print(f"PASSWORD_BCRYPT_ROUNDS={result['rounds']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Perfilador de SQL por petición y detector de N+1 (opcional, ``SQL_PROFILER``).
+
+- ``off`` (por defecto): no se registra nada.
+- ``log``: cuenta las sentencias de cada petición, registra las lentas
+  (``SQL_SLOW_QUERY_MS``) y las formas repetidas (``SQL_N_PLUS_ONE_THRESHOLD``) con su ruta.
+- ``dev``: además añade las cabeceras ``X-SQL-Queries``, ``X-SQL-Time-Ms`` y
+  ``X-SQL-N-Plus-One`` a cada respuesta.
+
+``assert_max_queries`` funciona aunque el perfilador esté apagado, para usarlo en tests.
+"""
+import contextvars
+import logging
+import os
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import List
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.metrics import route_template
+
+SQL_PROFILER = os.getenv("SQL_PROFILER", "off").lower()
+SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", "100"))
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "5"))
+
+logger = logging.getLogger(__name__)
+
+# Listas IN expandidas ("IN (?, ?, ?)" o "IN (%(id_1_1)s, ...)") se reducen a una sola forma
+_IN_LIST_RE = re.compile(r"IN \([^()]*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    return _SPACE_RE.sub(" ", _IN_LIST_RE.sub("IN (...)", statement)).strip()
+
+
+class RequestProfile:
+    __slots__ = ("route", "statements", "seconds", "shapes")
+
+    def __init__(self, route: str = ""):
+        self.route = route
+        self.statements = 0
+        self.seconds = 0.0
+        self.shapes: Counter = Counter()
+
+    def repeated(self):
+        """Formas ejecutadas al menos SQL_N_PLUS_ONE_THRESHOLD veces: probable N+1."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= SQL_N_PLUS_ONE_THRESHOLD]
+
+
+_profile: contextvars.ContextVar = contextvars.ContextVar("sql_profile", default=None)
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    context._profiler_start = time.perf_counter()
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _profile.get()
+    if profile is None:
+        return
+    elapsed = time.perf_counter() - context._profiler_start
+    profile.statements += 1
+    profile.seconds += elapsed
+    profile.shapes[statement_shape(statement)] += 1
+    if elapsed * 1000 >= SQL_SLOW_QUERY_MS:
+        logger.warning("Slow query (%.1f ms) on %s: %s", elapsed * 1000, profile.route or "-", statement[:500])
+
+
+def _event_target(engine):
+    # Sin motor concreto se escucha la clase Engine: primario, réplicas de lectura y
+    # cualquier motor creado después, sin tener que registrarlos uno a uno
+    if engine is None:
+        return Engine
+    return getattr(engine, "sync_engine", engine)
+
+
+def install(engine=None):
+    """Registra los eventos del perfilador (una vez al arrancar); por defecto en todos los motores."""
+    target = _event_target(engine)
+    event.listen(target, "before_cursor_execute", _before_execute)
+    event.listen(target, "after_cursor_execute", _after_execute)
+
+
+class ProfilerMiddleware:
+    """Middleware ASGI que abre un perfil por petición y lo resume al terminar."""
+
+    def __init__(self, app, headers: bool = False):
+        self.app = app
+        self.headers = headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(f'{scope["method"]} {scope["path"]}')
+        token = _profile.set(profile)
+
+        async def send_with_profile(message):
+            if message["type"] == "http.response.start":
+                profile.route = f'{scope["method"]} {route_template(scope)}'
+                if self.headers:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-sql-queries", str(profile.statements).encode()))
+                    headers.append((b"x-sql-time-ms", f"{profile.seconds * 1000:.1f}".encode()))
+                    repeated = profile.repeated()
+                    if repeated:
+                        headers.append((b"x-sql-n-plus-one", f"{repeated[0][1]}x {repeated[0][0][:200]}".encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            _profile.reset(token)
+            for shape, count in profile.repeated():
+                logger.warning("Probable N+1 on %s: %d x %s", profile.route, count, shape[:300])
+
+
+@contextmanager
+def assert_max_queries(limit: int, engine=None):
+    """Falla si dentro del bloque se ejecutan más de ``limit`` sentencias SQL (en cualquier
+    motor, réplicas incluidas, salvo que se indique ``engine``).
+
+    Ejemplo en pytest::
+
+        with assert_max_queries(4):
+            client.get("/posts/posts?size=20", headers=headers)
+    """
+    statements: List[str] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    target = _event_target(engine)
+    event.listen(target, "before_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        event.remove(target, "before_cursor_execute", _record)
+    assert len(statements) <= limit, (
+        f"{len(statements)} SQL statements executed (max {limit}):\n" + "\n".join(statements)
+    )
@@ -0,0 +1,67 @@
+import os
+from typing import Any, Hashable, Optional
+
+from fastapi import Response
+
+from app.cache import TTLCache
+
+# Respuestas JSON ya serializadas de las rutas de lectura más consultadas
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "2048"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+
+response_cache = TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+
+TAGS_KEY = ("tags",)
+# Lista de TagStats ordenada por post_count (GET /tags/stats recorta el top-N de aquí)
+TAG_STATS_KEY = ("tag-stats",)
+
+# Se incrementa en cada invalidación. Una lectura solo guarda su resultado si no hubo
+# invalidaciones mientras consultaba la base de datos, así una lectura lenta que empezó
+# antes de una escritura nunca repone datos obsoletos en la caché.
+_epoch = 0
+
+
+def post_key(post_id: int) -> tuple:
+    return ("post", post_id)
+
+
+def current_epoch() -> int:
+    return _epoch
+
+
+def get_cached(key: Hashable) -> Optional[Response]:
+    body = response_cache.get(key)
+    if body is None:
+        return None
+    return Response(content=body, media_type="application/json")
+
+
+def store(key: Hashable, body: bytes, epoch: Optional[int]) -> Response:
+    """Guarda el cuerpo serializado (si sigue vigente) y lo devuelve como respuesta.
+
+    ``epoch=None`` devuelve la respuesta sin guardarla (lectura que no debe llenar la caché).
+    """
+    if epoch is not None and epoch == _epoch:
+        response_cache.set(key, body)
+    return Response(content=body, media_type="application/json")
+
+
+def store_value(key: Hashable, value: Any, epoch: Optional[int]) -> Any:
+    """Como ``store`` pero para objetos ya construidos en lugar de bytes."""
+    if epoch is not None and epoch == _epoch:
+        response_cache.set(key, value)
+    return value
+
+
+def invalidate(*keys: Hashable) -> None:
+    global _epoch
+    _epoch += 1
+    for key in keys:
+        response_cache.pop(key)
+
+
+def invalidate_all() -> None:
+    """Vacía la caché; p. ej. cuando cambia un autor incluido en muchas respuestas."""
+    global _epoch
+    _epoch += 1
+    response_cache.clear()
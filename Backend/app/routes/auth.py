@@ -1,13 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, Body, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.security import OAuth2PasswordRequestForm
 from app.database import get_db
+from app.password_pool import run_password_task
 from app.models import User
-from app.auth import verify_password, create_access_token
+from app.auth import create_access_token
+from app.passwords import hash_password, password_stats, verify_and_update
 from app.schemas import TokenResponse
 from datetime import datetime, timedelta
 from jose import jwt, JWTError
-from passlib.context import CryptContext
 import os
 
 # Secret key (debe guardarse en variables de entorno en producción)
@@ -15,23 +17,30 @@ SECRET_KEY = "security_blog_secret_key"
 ALGORITHM = "HS256"
 RESET_TOKEN_EXPIRE_MINUTES = 15  # Expiración del token de reseteo en 15 minutos
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 router = APIRouter()
 
 # Endpoint de Login (se asume que se loguea por username; si deseas usar email, ajusta la consulta)
 @router.post("/login", response_model=TokenResponse)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
     # Se normaliza el username a minúsculas (si tu esquema ya lo hace, asegúrate de enviar el valor correcto)
     username = form_data.username.lower()
-    user = db.query(User).filter(User.username == username).first()
-    
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = (await db.execute(select(User).where(User.username == username))).scalars().first()
+
+    # bcrypt se ejecuta en el pool acotado para no bloquear las demás peticiones
+    valid, new_hash = False, None
+    if user:
+        valid, new_hash = await run_password_task(verify_and_update, form_data.password, user.hashed_password)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    # Hash con un coste distinto de PASSWORD_BCRYPT_ROUNDS: se guarda el recalculado
+    if new_hash is not None:
+        user.hashed_password = new_hash
+        await db.commit()
+        password_stats.rehashed += 1
     access_token = create_access_token({"sub": str(user.id)})
     return {"access_token": access_token, "token_type": "bearer", "user_id": user.id}
 
@@ -54,13 +63,13 @@ def verify_reset_token(token: str):
 
 # Endpoint para solicitar reseteo de contraseña
 @router.post("/request-password-reset")
-def request_password_reset(data: dict = Body(...), db: Session = Depends(get_db)):
+async def request_password_reset(data: dict = Body(...), db: AsyncSession = Depends(get_db)):
     email = data.get("email", "").lower()
     reminder = data.get("password_reminder", "")
     if not email or not reminder:
         raise HTTPException(status_code=400, detail="Email and password_reminder are required")
     
-    user = db.query(User).filter(User.email == email).first()
+    user = (await db.execute(select(User).where(User.email == email))).scalars().first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     if user.password_reminder != reminder:
@@ -72,11 +81,11 @@ def request_password_reset(data: dict = Body(...), db: Session = Depends(get_db)
 
 # Endpoint para resetear la contraseña
 @router.post("/reset-password")
-def reset_password(token: str = Body(...), new_password: str = Body(...), db: Session = Depends(get_db)):
+async def reset_password(token: str = Body(...), new_password: str = Body(...), db: AsyncSession = Depends(get_db)):
     email = verify_reset_token(token)
-    user = db.query(User).filter(User.email == email.lower()).first()
+    user = (await db.execute(select(User).where(User.email == email.lower()))).scalars().first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    user.hashed_password = pwd_context.hash(new_password)
-    db.commit()
+    user.hashed_password = await run_password_task(hash_password, new_password)
+    await db.commit()
     return {"message": "Password has been reset successfully"}
@@ -1,23 +1,45 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy.sql import func
-from fastapi.encoders import jsonable_encoder
-from typing import List
-
-from app.database import get_db
-from app.models import Post, Tag, Rating
-from app.schemas import PostCreate, PostResponse
-from app.auth import get_current_user
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from sqlalchemy import false, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, load_only, selectinload
+from sqlalchemy.sql import func, tuple_
+from fastapi.responses import StreamingResponse
+from pydantic_core import to_json
+from datetime import datetime
+from typing import Dict, List, Set, Tuple
+import base64
+import json
+
+from app.database import fills_response_cache, get_db, get_read_db, reads_response_cache
+from app.models import Post, Tag, Rating, post_tags, make_excerpt, tag_count_params, tag_post_count_update
+from app.schemas import (
+    BulkResponse, LeaderboardItem, LeaderboardResponse, PostCreate, PostListItem, PostListResponse, PostResponse, PostSearchItem, PostSearchResponse,
+    PostSummaryItem,
+)
+from app.serialization import FastJSONResponse
+from app.auth import Principal, get_current_principal
+from app import bulk, export, leaderboard, response_cache, search
+from app.tagging import get_or_create_tags
 
 router = APIRouter()
 
 
+async def _get_post(db: AsyncSession, id: int):
+    """Carga un post con autor y etiquetas (AsyncSession no permite cargas perezosas)."""
+    result = await db.execute(
+        select(Post)
+        .options(joinedload(Post.author), selectinload(Post.tags))
+        .where(Post.id == id)
+    )
+    return result.scalars().first()
+
+
 # ✅ Publish and Unpublish a Post (Protected)
 @router.patch("/posts/{id}/publish", response_model=PostResponse)
-def toggle_publish_post(
-    id: int, publish: bool, db: Session = Depends(get_db), user=Depends(get_current_user)
+async def toggle_publish_post(
+    id: int, publish: bool, db: AsyncSession = Depends(get_db), user: Principal = Depends(get_current_principal)
 ):
-    post = db.query(Post).filter(Post.id == id).first()
+    post = await _get_post(db, id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
 
@@ -26,100 +48,408 @@ def toggle_publish_post(
         raise HTTPException(status_code=403, detail="Not authorized to modify this post")
 
     post.is_published = publish
-    db.commit()
-    db.refresh(post)
+    await db.commit()
+    response_cache.invalidate(response_cache.post_key(id), response_cache.TAG_STATS_KEY)
+    if not publish:
+        leaderboard.forget_post(id)
     return post
 
 
 from typing import Optional
 from app.models import User  # Asegúrate de tener importado el modelo de usuario si lo usas
 
-@router.get("/posts", response_model=dict)
-def get_posts(
-    db: Session = Depends(get_db),
+
+async def _user_ratings(db: AsyncSession, post_ids: List[int], user_id: Optional[int]) -> Dict[int, float]:
+    """Devuelve {post_id: calificación del usuario} para todos los posts de la página en una sola consulta."""
+    if not post_ids or user_id is None:
+        return {}
+
+    result = await db.execute(
+        select(Rating.post_id, Rating.rating)
+        .where(Rating.post_id.in_(post_ids), Rating.user_id == user_id)
+    )
+    return dict(result.all())
+
+
+def _encode_cursor(post: Post) -> str:
+    """Cursor opaco con la posición (created_at, id) del último post de la página."""
+    raw = json.dumps([post.created_at.isoformat(), post.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, post_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), int(post_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+_SUMMARY_COLUMNS = (
+    Post.title, Post.excerpt, Post.is_published, Post.created_at, Post.updated_at,
+    Post.author_id, Post.rating_count, Post.rating_sum,
+)
+
+
+def _summary_options():
+    # Solo las columnas del listado: content queda diferido y el autor se reduce a id/username
+    return (
+        load_only(*_SUMMARY_COLUMNS),
+        joinedload(Post.author).load_only(User.id, User.username),
+        selectinload(Post.tags),
+    )
+
+
+async def _paginate_posts(
+    db: AsyncSession,
+    query,
+    page: int,
+    size: int,
+    cursor: Optional[str],
+    include_total: Optional[bool],
+    user_id: Optional[int],
+    view: str = "full",
+) -> PostListResponse:
+    """Pagina (por página o por cursor) y serializa un query de posts ya filtrado."""
+    total_posts = None
+    # Con cursor el total es opcional (include_total=true): el COUNT recorre todo el filtro en cada página
+    if include_total is None:
+        include_total = cursor is None
+    if include_total:
+        total_posts = await db.scalar(select(func.count()).select_from(query.subquery()))
+
+    # Orden estable por (created_at, id), respaldado por los índices de posts
+    if view == "summary":
+        query = query.options(*_summary_options())
+        item_model = PostSummaryItem
+    else:
+        query = query.options(joinedload(Post.author), selectinload(Post.tags))
+        item_model = PostListItem
+    query = query.order_by(Post.created_at.desc(), Post.id.desc())
+
+    if cursor:
+        # Paginación por cursor: búsqueda por índice, sin OFFSET, coste constante en cualquier página
+        query = query.where(tuple_(Post.created_at, Post.id) < _decode_cursor(cursor))
+    else:
+        query = query.offset((page - 1) * size)
+
+    # Se pide un elemento extra para saber si existe una página siguiente
+    posts = (await db.execute(query.limit(size + 1))).scalars().all()
+    has_next = len(posts) > size
+    posts = posts[:size]
+
+    # El promedio viene de los agregados del post; la calificación del usuario, de una sola consulta
+    user_ratings = await _user_ratings(db, [post.id for post in posts], user_id)
+
+    # ORM -> modelo de respuesta -> bytes en una sola pasada (ver app/serialization.py)
+    items = []
+    for post in posts:
+        item = item_model.model_validate(post)
+        item.user_rating = user_ratings.get(post.id)  # Esta propiedad se usará en el frontend
+        items.append(item)
+
+    return PostListResponse(
+        total=total_posts,
+        page=None if cursor else page,
+        size=size,
+        next_cursor=_encode_cursor(posts[-1]) if has_next else None,
+        posts=items,
+    )
+
+
+async def _tags_filter(db: AsyncSession, tag_names: Set[str], match: str):
+    """Condición sobre Post.id para filtrar por etiquetas sin unir (ni duplicar) filas de posts.
+
+    Los nombres se resuelven a ids una sola vez; el semijoin sobre post_tags usa
+    ix_post_tags_tag_id_post_id (búsqueda por etiqueta, solo índice).
+    """
+    tag_ids = (await db.execute(select(Tag.id).where(Tag.name.in_(tag_names)))).scalars().all()
+    if not tag_ids or (match == "all" and len(tag_ids) < len(tag_names)):
+        return false()
+
+    tagged = select(post_tags.c.post_id).where(post_tags.c.tag_id.in_(tag_ids))
+    if match == "all":
+        tagged = tagged.group_by(post_tags.c.post_id).having(func.count() == len(tag_ids))
+    return Post.id.in_(tagged)
+
+
+@router.get("/posts", response_model=PostListResponse)
+async def get_posts(
+    db: AsyncSession = Depends(get_read_db),
     page: int = Query(1, ge=1),
     size: int = Query(10, ge=1, le=100),
     tag_name: Optional[str] = Query(None),
-    user: Optional[User] = Depends(get_current_user)  # Si get_current_user falla, puedes crear una versión opcional
+    tags: Optional[str] = Query(None, description="Nombres de etiquetas separados por comas"),
+    match: str = Query("any", pattern="^(all|any)$", description="all: todas las etiquetas; any: alguna"),
+    author_id: Optional[int] = Query(None),
+    is_published: Optional[bool] = Query(None),
+    mine: bool = Query(False, description="Solo los posts del usuario autenticado"),
+    cursor: Optional[str] = Query(None, description="next_cursor de la respuesta anterior; activa la paginación por cursor"),
+    include_total: Optional[bool] = Query(
+        None, description="Calcular el total de posts (COUNT adicional); por defecto sí por página y no con cursor"
+    ),
+    view: str = Query("full", pattern="^(full|summary)$", description="summary: resumen en lugar del contenido completo"),
+    user: Principal = Depends(get_current_principal)
 ):
-    query = db.query(Post).options(joinedload(Post.author), joinedload(Post.tags))
+    query = select(Post)
+
+    if mine:
+        author_id = user.id
+    # Filtros resueltos por ix_posts_author_published_created
+    if author_id is not None:
+        query = query.where(Post.author_id == author_id)
+    if is_published is not None:
+        query = query.where(Post.is_published == is_published)
 
+    tag_names = {name.strip() for name in (tags or "").split(",") if name.strip()}
     if tag_name:
-        query = query.join(Post.tags).filter(Tag.name == tag_name)
+        tag_names.add(tag_name)
+    if tag_names:
+        query = query.where(await _tags_filter(db, tag_names, match))
 
-    total_posts = db.query(func.count()).select_from(query.subquery()).scalar()
+    result = await _paginate_posts(db, query, page, size, cursor, include_total, user.id if user else None, view)
 
-    if total_posts == 0:
+    if result.total == 0:
         raise HTTPException(status_code=404, detail="No posts found")
 
-    posts = query.offset((page - 1) * size).limit(size).all()
+    return FastJSONResponse(result)
 
-    serialized_posts = []
-    for post in posts:
-        # Calcular el promedio de ratings
-        average_rating = db.query(func.avg(Rating.rating))\
-                           .filter(Rating.post_id == post.id)\
-                           .scalar() or 0.0
-
-        # Consultar la calificación del usuario si está autenticado
-        user_rating = None
-        if user:
-            user_rating = db.query(Rating.rating)\
-                            .filter(Rating.post_id == post.id, Rating.user_id == user.id)\
-                            .scalar()
-
-        serialized_post = jsonable_encoder(post)
-        serialized_post["author"] = jsonable_encoder(post.author)
-        serialized_post["tags"] = jsonable_encoder(post.tags)
-        serialized_post["average_rating"] = average_rating
-        serialized_post["user_rating"] = user_rating  # Esta propiedad se usará en el frontend
-        serialized_posts.append(serialized_post)
-
-    return {
-        "total": total_posts,
-        "page": page,
-        "size": size,
-        "posts": serialized_posts,
-    }
+
+# 📤 Exportación completa en streaming (memoria constante con cualquier número de posts)
+@router.get("/export")
+async def export_posts(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    db: AsyncSession = Depends(get_db),
+    user: Principal = Depends(get_current_principal),
+):
+    statement = export.export_query(db.bind.dialect.name, search.visible_to(user.id))
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        export.stream_export(statement, export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=posts.{export_format}"},
+    )
+
+
+async def _leaderboard_response(
+    db: AsyncSession, entries: List[Tuple[int, float]], limit: int, user_id: int
+) -> FastJSONResponse:
+    """Completa los ids del ranking con sus datos (una consulta por clave primaria)."""
+    ids = [post_id for post_id, _ in entries]
+    result = await db.execute(
+        select(Post).options(*_summary_options()).where(Post.id.in_(ids), Post.is_published == True)  # noqa: E712
+    )
+    posts = {post.id: post for post in result.scalars()}
+    user_ratings = await _user_ratings(db, list(posts), user_id)
+
+    items = []
+    for post_id, score in entries:
+        post = posts.get(post_id)
+        if post is None:
+            continue  # despublicado o borrado desde el último refresco
+        item = LeaderboardItem.model_validate(post)
+        item.user_rating = user_ratings.get(post_id)
+        item.score = round(score, 4)
+        items.append(item)
+    return FastJSONResponse(LeaderboardResponse(posts=items[:limit]))
+
+
+# 🏆 Mejor valorados (media bayesiana), servidos desde el ranking en memoria
+@router.get("/top", response_model=LeaderboardResponse)
+async def get_top_posts(
+    limit: int = Query(10, ge=1, le=leaderboard.LEADERBOARD_SIZE),
+    db: AsyncSession = Depends(get_read_db),
+    user: Principal = Depends(get_current_principal),
+):
+    await leaderboard.ensure_loaded()
+    entries = leaderboard.top_rated.top(min(limit * 2, leaderboard.LEADERBOARD_SIZE))
+    return await _leaderboard_response(db, entries, limit, user.id)
+
+
+# 🔥 Tendencia: calificaciones recientes con decaimiento exponencial
+@router.get("/trending", response_model=LeaderboardResponse)
+async def get_trending_posts(
+    limit: int = Query(10, ge=1, le=leaderboard.LEADERBOARD_SIZE),
+    db: AsyncSession = Depends(get_read_db),
+    user: Principal = Depends(get_current_principal),
+):
+    await leaderboard.ensure_loaded()
+    entries = [
+        (post_id, leaderboard.trending_score_to_now(score))
+        for post_id, score in leaderboard.trending.top(min(limit * 2, leaderboard.LEADERBOARD_SIZE))
+    ]
+    return await _leaderboard_response(db, entries, limit, user.id)
+
+
+# ✅ Borradores del usuario autenticado (un solo rango del índice por autor)
+@router.get("/me/drafts", response_model=PostListResponse)
+async def get_my_drafts(
+    db: AsyncSession = Depends(get_read_db),
+    page: int = Query(1, ge=1),
+    size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    include_total: Optional[bool] = Query(None),
+    view: str = Query("full", pattern="^(full|summary)$"),
+    user: Principal = Depends(get_current_principal),
+):
+    query = select(Post).where(Post.author_id == user.id, Post.is_published == False)  # noqa: E712
+    return FastJSONResponse(await _paginate_posts(db, query, page, size, cursor, include_total, user.id, view))
+
+
+# ✅ Búsqueda de texto completo en título y contenido, ordenada por relevancia
+@router.get("/search", response_model=PostSearchResponse)
+async def search_posts(
+    q: str = Query(..., min_length=1, max_length=200),
+    page: int = Query(1, ge=1),
+    size: int = Query(10, ge=1, le=100),
+    include_total: bool = Query(False, description="Calcular el total de coincidencias (requiere un COUNT adicional)"),
+    db: AsyncSession = Depends(get_read_db),
+    user: Principal = Depends(get_current_principal),
+):
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Search query cannot be empty")
+    if not search.is_supported(db.bind.dialect.name):
+        raise HTTPException(status_code=501, detail="Full-text search is not available on this database")
+
+    query = search.search_posts(db.bind.dialect.name, q).where(search.visible_to(user.id))
+
+    total = None
+    if include_total:
+        total = await db.scalar(select(func.count()).select_from(query.subquery()))
+
+    rows = (await db.execute(
+        query.options(joinedload(Post.author), selectinload(Post.tags))
+        .offset((page - 1) * size)
+        .limit(size)
+    )).all()
+
+    items = []
+    for post, rank in rows:
+        item = PostSearchItem.model_validate(post)
+        item.rank = float(rank)
+        items.append(item)
+
+    return FastJSONResponse(PostSearchResponse(total=total, page=page, size=size, posts=items))
 
 
 # ✅ Create a New Post (Protected)
 @router.post("/posts", response_model=PostResponse)
-def create_post(post: PostCreate, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    tags = db.query(Tag).filter(Tag.id.in_(post.tag_ids)).all()
+async def create_post(post: PostCreate, db: AsyncSession = Depends(get_db), user: Principal = Depends(get_current_principal)):
+    # tag_ids y tag_names (creando las que falten) se resuelven en una sola consulta
+    tags = await get_or_create_tags(db, post.tag_names, post.tag_ids)
 
     db_post = Post(title=post.title, content=post.content, author_id=user.id, tags=tags)  # 🔹 FIXED
     db.add(db_post)
-    db.commit()
-    db.refresh(db_post)
-    return db_post
+    await db.commit()
+    if post.tag_names:
+        response_cache.invalidate(response_cache.TAGS_KEY)
+    return await _get_post(db, db_post.id)
+
+
+async def _insert_posts_chunk(db: AsyncSession, items: List[PostCreate], author_id: int) -> None:
+    """Inserta un bloque de posts y sus etiquetas con executemany (sin refresh por fila)."""
+    tags = await get_or_create_tags(
+        db,
+        [name for item in items for name in item.tag_names],
+        [tag_id for item in items for tag_id in item.tag_ids],
+    )
+    known_tags = {tag.id for tag in tags}
+    tag_ids_by_name = {tag.name: tag.id for tag in tags}
+
+    now = datetime.utcnow()
+    rows = [
+        {
+            "title": item.title,
+            "content": item.content,
+            "excerpt": make_excerpt(item.content),
+            "is_published": item.is_published,
+            "author_id": author_id,
+            "created_at": now,
+        }
+        for item in items
+    ]
+
+    if db.bind.dialect.name == "postgresql":
+        # Reservar los ids del bloque en una sola consulta para insertar con executemany
+        ids = (await db.execute(
+            text("SELECT nextval(pg_get_serial_sequence('posts', 'id')) FROM generate_series(1, :n)"),
+            {"n": len(rows)},
+        )).scalars().all()
+        for row, post_id in zip(rows, ids):
+            row["id"] = post_id
+        await db.execute(insert(Post.__table__), rows)
+    else:
+        # SQLite no tiene secuencias: el ORM obtiene cada id del propio INSERT
+        posts = [Post(**row) for row in rows]
+        db.add_all(posts)
+        await db.flush()
+        for row, post in zip(rows, posts):
+            row["id"] = post.id
+
+    links = [
+        {"post_id": row["id"], "tag_id": tag_id}
+        for row, item in zip(rows, items)
+        for tag_id in dict.fromkeys(
+            [tag_id for tag_id in item.tag_ids if tag_id in known_tags]
+            + [tag_ids_by_name[name] for name in item.tag_names]
+        )
+    ]
+    if links:
+        await db.execute(insert(post_tags), links)
+
+    # Core no dispara los eventos de sesión: contar aquí los posts publicados por etiqueta
+    published_ids = {row["id"] for row in rows if row["is_published"]}
+    tag_deltas: Dict[int, int] = {}
+    for link in links:
+        if link["post_id"] in published_ids:
+            tag_deltas[link["tag_id"]] = tag_deltas.get(link["tag_id"], 0) + 1
+    if tag_deltas:
+        await db.execute(tag_post_count_update, tag_count_params(tag_deltas))
+
+
+# 📦 Carga masiva de posts (formato y errores por fila: ver app/bulk.py)
+@router.post("/bulk", response_model=BulkResponse)
+async def bulk_create_posts(
+    request: Request, db: AsyncSession = Depends(get_db), user: Principal = Depends(get_current_principal)
+):
+    errors: List[dict] = []
+    accepted = 0
+
+    async def write(rows):
+        await _insert_posts_chunk(db, [item for _, item in rows], user.id)
+
+    async for chunk in bulk.iter_validated_chunks(request, PostCreate, errors):
+        items = [item for rows, _ in await bulk.write_chunk(db, chunk, write, errors) for _, item in rows]
+        accepted += len(items)
+        if any(item.tag_names for item in items):
+            response_cache.invalidate(response_cache.TAGS_KEY)
+        if any(item.is_published for item in items):
+            response_cache.invalidate(response_cache.TAG_STATS_KEY)
+
+    errors.sort(key=lambda error: error["index"])
+    return {"received": accepted + len(errors), "accepted": accepted, "failed": len(errors), "errors": errors}
 
 
 @router.get("/posts/{id}", response_model=PostResponse)
-def get_post(id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    post = (
-        db.query(Post)
-        .options(joinedload(Post.author), joinedload(Post.tags))
-        .filter(Post.id == id)
-        .first()
-    )
+async def get_post(id: int, db: AsyncSession = Depends(get_read_db), user: Principal = Depends(get_current_principal)):
+    key = response_cache.post_key(id)
+    cached = response_cache.get_cached(key) if reads_response_cache(db) else None
+    if cached is not None:
+        return cached
+
+    epoch = response_cache.current_epoch() if fills_response_cache(db) else None
+    post = await _get_post(db, id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
-    
-    # Calcular el promedio de ratings para el post
-    average_rating = db.query(func.avg(Rating.rating)) \
-                       .filter(Rating.post_id == id) \
-                       .scalar() or 0.0
-    
-    # Serializar el post e incluir el average_rating
-    serialized_post = jsonable_encoder(post)
-    serialized_post["average_rating"] = average_rating
-    return serialized_post
+
+    # Serializar el post una sola vez (average_rating sale de los agregados) y cachear los bytes
+    body = to_json(PostResponse.model_validate(post))
+    return response_cache.store(key, body, epoch)
 
 
 @router.put("/posts/{id}", response_model=PostResponse)
-def update_post(id: int, post_data: PostCreate, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    db_post = db.query(Post).filter(Post.id == id).first()
+async def update_post(id: int, post_data: PostCreate, db: AsyncSession = Depends(get_db), user: Principal = Depends(get_current_principal)):
+    db_post = await _get_post(db, id)
     if not db_post:
         raise HTTPException(status_code=404, detail="Post not found")
 
@@ -133,18 +463,22 @@ def update_post(id: int, post_data: PostCreate, db: Session = Depends(get_db), u
     db_post.is_published = post_data.is_published  # Aseguramos que se actualice este campo
 
     # Handle tag updates if provided
-    if post_data.tag_ids:
-        db_post.tags = db.query(Tag).filter(Tag.id.in_(post_data.tag_ids)).all()
-
-    db.commit()
-    db.refresh(db_post)
+    if post_data.tag_ids or post_data.tag_names:
+        db_post.tags = await get_or_create_tags(db, post_data.tag_names, post_data.tag_ids)
+
+    await db.commit()
+    if post_data.tag_names:
+        response_cache.invalidate(response_cache.TAGS_KEY)
+    response_cache.invalidate(response_cache.post_key(id), response_cache.TAG_STATS_KEY)
+    if not db_post.is_published:
+        leaderboard.forget_post(id)
     return db_post
 
 
 # ✅ Delete a Post (Only the Author Can Delete)
 @router.delete("/posts/{id}")
-def delete_post(id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    post = db.query(Post).filter(Post.id == id).first()
+async def delete_post(id: int, db: AsyncSession = Depends(get_db), user: Principal = Depends(get_current_principal)):
+    post = await db.get(Post, id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
 
@@ -152,6 +486,8 @@ def delete_post(id: int, db: Session = Depends(get_db), user=Depends(get_current
     if post.author_id != user.id:  # 🔹 FIXED
         raise HTTPException(status_code=403, detail="Not authorized to delete this post")
 
-    db.delete(post)
-    db.commit()
+    await db.delete(post)
+    await db.commit()
+    response_cache.invalidate(response_cache.post_key(id), response_cache.TAG_STATS_KEY)
+    leaderboard.forget_post(id)
     return {"message": "Post deleted successfully"}
@@ -1,55 +1,199 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy.sql import func
+from fastapi import APIRouter, HTTPException, Depends, Request
+from sqlalchemy import bindparam, case, func, insert, select, true, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import List, Set, Tuple
 from app.database import get_db
-from app.models import Rating, Post, User
-from app.schemas import RatingCreate, RatingResponse
-from app.auth import get_current_user
+from app.models import Rating, Post
+from app.schemas import BulkResponse, RatingCreate, RatingResponse
+from app.auth import Principal, get_current_principal
+from app import bulk, leaderboard, response_cache
 
 router = APIRouter()
 
+async def _upsert_rating(db: AsyncSession, post_id: int, user_id: int, value: float):
+    """Guarda la calificación del usuario y ajusta los agregados del post.
+
+    Devuelve (rating_count, rating_sum, is_published, rated_at, previous, previous_rated_at),
+    o ``None`` si el post no existe.
+
+    PostgreSQL: se bloquea la fila del post y una sola sentencia lee la calificación
+    anterior, hace INSERT ... ON CONFLICT (post_id, user_id) DO UPDATE y actualiza los
+    contadores. El bloqueo serializa a quienes califican el mismo post, así un doble
+    envío simultáneo no puede contar dos veces ni chocar con unique_post_user_rating.
+    En SQLite (desarrollo) son varias sentencias dentro del bloqueo de escritura de la base.
+    """
+    ratings, posts = Rating.__table__, Post.__table__
+    now = datetime.utcnow()
+
+    if db.bind.dialect.name == "postgresql":
+        locked = await db.execute(select(posts.c.id).where(posts.c.id == post_id).with_for_update())
+        if locked.first() is None:
+            return None
+
+        previous = select(ratings.c.rating, ratings.c.rated_at).where(
+            ratings.c.post_id == post_id, ratings.c.user_id == user_id
+        ).cte("previous")
+        upsert = pg_insert(ratings).values(post_id=post_id, user_id=user_id, rating=value, rated_at=now)
+        upsert = upsert.on_conflict_do_update(
+            constraint="unique_post_user_rating",
+            set_={"rating": upsert.excluded.rating, "rated_at": upsert.excluded.rated_at},
+        ).returning(ratings.c.rated_at).cte("upsert")
+        previous_rating = select(previous.c.rating).scalar_subquery()
+        aggregates = (
+            posts.update()
+            .where(posts.c.id == post_id)
+            .values(
+                rating_count=posts.c.rating_count + case((previous_rating.is_(None), 1), else_=0),
+                rating_sum=posts.c.rating_sum + value - func.coalesce(previous_rating, 0),
+            )
+            .returning(posts.c.rating_count, posts.c.rating_sum, posts.c.is_published)
+            .cte("aggregates")
+        )
+        return (await db.execute(
+            select(
+                aggregates.c.rating_count, aggregates.c.rating_sum, aggregates.c.is_published,
+                upsert.c.rated_at, previous_rating, select(previous.c.rated_at).scalar_subquery(),
+            ).select_from(aggregates.join(upsert, true()))
+        )).first()
+
+    # SQLite: la primera sentencia ya escribe para tomar el bloqueo de escritura; leer antes
+    # haría que dos envíos simultáneos se bloquearan entre sí ("database is locked")
+    locked = await db.execute(
+        posts.update().where(posts.c.id == post_id).values(rating_count=posts.c.rating_count)
+    )
+    if locked.rowcount == 0:
+        return None
+    current = (await db.execute(
+        select(ratings.c.rating, ratings.c.rated_at).where(ratings.c.post_id == post_id, ratings.c.user_id == user_id)
+    )).first()
+    previous, previous_rated_at = current if current else (None, None)
+
+    upsert = sqlite_insert(ratings).values(post_id=post_id, user_id=user_id, rating=value, rated_at=now)
+    await db.execute(upsert.on_conflict_do_update(
+        index_elements=[ratings.c.post_id, ratings.c.user_id],
+        set_={"rating": upsert.excluded.rating, "rated_at": upsert.excluded.rated_at},
+    ))
+    await db.execute(
+        posts.update()
+        .where(posts.c.id == post_id)
+        .values(
+            rating_count=posts.c.rating_count + (1 if previous is None else 0),
+            rating_sum=posts.c.rating_sum + value - (previous or 0.0),
+        )
+    )
+    rating_count, rating_sum, is_published = (await db.execute(
+        select(posts.c.rating_count, posts.c.rating_sum, posts.c.is_published).where(posts.c.id == post_id)
+    )).one()
+    return rating_count, rating_sum, is_published, now, previous, previous_rated_at
+
+
 @router.post("/ratings", response_model=RatingResponse)
-def rate_post(
+async def rate_post(
     rating_data: RatingCreate,
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    user: Principal = Depends(get_current_principal)
 ):
-    # Verificar que el post existe
-    post = db.query(Post).filter(Post.id == rating_data.post_id).first()
-    if not post:
+    result = await _upsert_rating(db, rating_data.post_id, user.id, rating_data.rating)
+    if result is None:
         raise HTTPException(status_code=404, detail="Post not found")
+    await db.commit()
+
+    rating_count, rating_sum, is_published, rated_at, previous, previous_rated_at = result
+    response_cache.invalidate(response_cache.post_key(rating_data.post_id))
+    leaderboard.record_rating(
+        rating_data.post_id, is_published, rating_count, rating_sum,
+        rating_data.rating, rated_at, previous, previous_rated_at,
+    )
+    return RatingResponse(new_average=rating_sum / rating_count if rating_count else 0.0)
+
 
-    # Buscar todas las calificaciones para este post y usuario
-    existing_ratings = db.query(Rating).filter(
-        Rating.post_id == rating_data.post_id,
-        Rating.user_id == user.id
-    ).all()
-
-    if existing_ratings:
-        # Usar el primer registro como el principal y actualizar su rating
-        main_rating = existing_ratings[0]
-        main_rating.rating = rating_data.rating
-
-        # Eliminar cualquier registro duplicado que exista (si hubiera)
-        if len(existing_ratings) > 1:
-            for dup in existing_ratings[1:]:
-                db.delete(dup)
-        db.commit()
-        db.refresh(main_rating)
-    else:
-        # Insertar una nueva calificación si no existe ninguna
-        main_rating = Rating(
-            post_id=rating_data.post_id,
-            rating=rating_data.rating,
-            user_id=user.id
+async def _upsert_ratings_chunk(
+    db: AsyncSession, chunk: List[Tuple[int, RatingCreate]], user_id: int, errors: List[dict]
+) -> Set[int]:
+    """Inserta/actualiza un bloque de calificaciones y ajusta los agregados de cada post.
+
+    Se escribe con Core (executemany), así que los eventos de Rating no se disparan y
+    los deltas de rating_count/rating_sum se calculan aquí. Devuelve los posts afectados.
+    """
+    post_ids = {item.post_id for _, item in chunk}
+    # Mismo bloqueo que rate_post (en orden de id para no provocar deadlocks entre bloques)
+    found = set((await db.execute(
+        select(Post.id).where(Post.id.in_(post_ids)).order_by(Post.id).with_for_update()
+    )).scalars())
+
+    # La última calificación de cada post dentro del bloque es la que se guarda
+    latest = {}
+    for index, item in chunk:
+        if item.post_id not in found:
+            errors.append({"index": index, "errors": [{"msg": "Post not found"}]})
+            continue
+        latest[item.post_id] = item.rating
+
+    if not latest:
+        return set()
+
+    current = dict((await db.execute(
+        select(Rating.post_id, Rating.rating)
+        .where(Rating.user_id == user_id, Rating.post_id.in_(latest))
+    )).all())
+
+    inserts, updates, deltas = [], [], []
+    for post_id, rating in latest.items():
+        previous = current.get(post_id)
+        if previous is None:
+            inserts.append({"post_id": post_id, "user_id": user_id, "rating": rating})
+            deltas.append({"b_id": post_id, "b_count": 1, "b_sum": rating})
+        elif previous != rating:
+            updates.append({"b_post_id": post_id, "b_rating": rating})
+            deltas.append({"b_id": post_id, "b_count": 0, "b_sum": rating - previous})
+
+    ratings, posts = Rating.__table__, Post.__table__
+    if inserts:
+        await db.execute(insert(ratings), inserts)
+    if updates:
+        await db.execute(
+            update(ratings)
+            .where(ratings.c.post_id == bindparam("b_post_id"), ratings.c.user_id == user_id)
+            .values(rating=bindparam("b_rating")),
+            updates,
         )
-        db.add(main_rating)
-        db.commit()
-        db.refresh(main_rating)
+    if deltas:
+        await db.execute(
+            update(posts)
+            .where(posts.c.id == bindparam("b_id"))
+            .values(
+                rating_count=posts.c.rating_count + bindparam("b_count"),
+                rating_sum=posts.c.rating_sum + bindparam("b_sum"),
+            ),
+            deltas,
+        )
+    return {delta["b_id"] for delta in deltas}
+
+
+# 📦 Carga masiva de calificaciones (formato y errores por fila: ver app/bulk.py)
+@router.post("/bulk", response_model=BulkResponse)
+async def bulk_rate_posts(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    user: Principal = Depends(get_current_principal)
+):
+    errors: List[dict] = []
+    accepted = 0
+
+    async def write(rows):
+        # Los "Post not found" de un intento fallido se descartan con él
+        row_errors: List[dict] = []
+        changed = await _upsert_ratings_chunk(db, rows, user.id, row_errors)
+        return changed, row_errors
 
-    # Calcular el promedio actualizado de calificaciones para el post
-    avg_rating = db.query(func.avg(Rating.rating)).filter(
-        Rating.post_id == rating_data.post_id
-    ).scalar() or 0.0
+    async for chunk in bulk.iter_validated_chunks(request, RatingCreate, errors):
+        for rows, (changed, row_errors) in await bulk.write_chunk(db, chunk, write, errors):
+            errors.extend(row_errors)
+            accepted += len(rows) - len(row_errors)
+            response_cache.invalidate(*(response_cache.post_key(post_id) for post_id in changed))
 
-    return RatingResponse(new_average=float(avg_rating))
+    errors.sort(key=lambda error: error["index"])
+    return {"received": accepted + len(errors), "accepted": accepted, "failed": len(errors), "errors": errors}
@@ -0,0 +1,34 @@
+from fastapi import APIRouter
+from app.auth import principal_cache
+from app.database import pool_status
+from app.leaderboard import leaderboard_status
+from app.password_pool import password_pool_status
+from app.passwords import password_hashing_status
+from app.response_cache import response_cache
+
+router = APIRouter()
+
+# Estado e instrumentación del pool de conexiones a la base de datos
+@router.get("/db-pool")
+async def get_db_pool_stats():
+    return pool_status()
+
+# Aciertos y fallos de la caché de identidades (get_current_principal)
+@router.get("/principal-cache")
+async def get_principal_cache_stats():
+    return principal_cache.stats()
+
+# Cola del pool de hashing de contraseñas (bcrypt), coste configurado y rehashes en login
+@router.get("/password-pool")
+async def get_password_pool_stats():
+    return {**password_pool_status(), **password_hashing_status()}
+
+# Caché de respuestas serializadas (GET /tags/tags y GET /posts/posts/{id})
+@router.get("/response-cache")
+async def get_response_cache_stats():
+    return response_cache.stats()
+
+# Tamaño y antigüedad de los rankings en memoria (GET /posts/top y /posts/trending)
+@router.get("/leaderboard")
+async def get_leaderboard_stats():
+    return leaderboard_status()
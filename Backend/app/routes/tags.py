@@ -1,25 +1,78 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import fills_response_cache, get_db, get_read_db, reads_response_cache
 from app.models import Tag
-from app.schemas import TagCreate, TagResponse
-from typing import List
+from app.schemas import TagCreate, TagResponse, TagStats
+from typing import List, Optional
+from app import response_cache
+from app.tagging import get_or_create_tags
 
 router = APIRouter()
 
+_tag_list = TypeAdapter(List[TagResponse])
+_tag_stats_list = TypeAdapter(List[TagStats])
+
 # Crear una nueva etiqueta
 @router.post("/tags", response_model=TagResponse)
-def create_tag(tag: TagCreate, db: Session = Depends(get_db)):
-    db_tag = db.query(Tag).filter(Tag.name == tag.name).first()
+async def create_tag(tag: TagCreate, db: AsyncSession = Depends(get_db)):
+    db_tag = (await db.execute(select(Tag).where(Tag.name == tag.name))).scalars().first()
     if db_tag:
         raise HTTPException(status_code=400, detail="Tag already exists")
     new_tag = Tag(name=tag.name)
     db.add(new_tag)
-    db.commit()
-    db.refresh(new_tag)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Otra petición la creó entre el SELECT y el INSERT
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Tag already exists")
+    response_cache.invalidate(response_cache.TAGS_KEY)
     return new_tag
 
+# Obtener o crear varias etiquetas en una sola sentencia (idempotente)
+@router.post("/bulk", response_model=List[TagResponse])
+async def bulk_create_tags(tags: List[TagCreate], db: AsyncSession = Depends(get_db)):
+    db_tags = await get_or_create_tags(db, [tag.name for tag in tags])
+    await db.commit()
+    response_cache.invalidate(response_cache.TAGS_KEY)
+    by_name = {tag.name: tag for tag in db_tags}
+    return [by_name[name] for name in dict.fromkeys(tag.name for tag in tags)]
+
 # Obtener todas las etiquetas
 @router.get("/tags", response_model=List[TagResponse])
-def get_tags(db: Session = Depends(get_db)):
-    return db.query(Tag).all()
+async def get_tags(db: AsyncSession = Depends(get_read_db)):
+    cached = response_cache.get_cached(response_cache.TAGS_KEY) if reads_response_cache(db) else None
+    if cached is not None:
+        return cached
+
+    epoch = response_cache.current_epoch() if fills_response_cache(db) else None
+    tags = (await db.execute(select(Tag))).scalars().all()
+    body = _tag_list.dump_json(_tag_list.validate_python(tags, from_attributes=True))
+    return response_cache.store(response_cache.TAGS_KEY, body, epoch)
+
+# Posts publicados por etiqueta, de mayor a menor (nube de etiquetas del Navbar).
+# Se lee el contador tags.post_count, sin agregar post_tags, y la lista ordenada queda en
+# memoria hasta que una escritura de posts la invalida (o vence RESPONSE_CACHE_TTL).
+@router.get("/stats", response_model=List[TagStats])
+async def get_tag_stats(
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Solo las N etiquetas más usadas"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    stats = response_cache.response_cache.get(response_cache.TAG_STATS_KEY) if reads_response_cache(db) else None
+    if stats is None:
+        epoch = response_cache.current_epoch() if fills_response_cache(db) else None
+        result = await db.execute(
+            select(Tag.id, Tag.name, Tag.post_count)
+            .where(Tag.post_count > 0)
+            .order_by(Tag.post_count.desc(), Tag.name)
+        )
+        stats = response_cache.store_value(
+            response_cache.TAG_STATS_KEY,
+            [TagStats(id=tag_id, name=name, post_count=post_count) for tag_id, name, post_count in result],
+            epoch,
+        )
+    return Response(content=_tag_stats_list.dump_json(stats[:limit]), media_type="application/json")
+
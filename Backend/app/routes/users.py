@@ -1,65 +1,71 @@
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db, get_read_db
+from app.password_pool import run_password_task
 from app.models import User
 from app.schemas import UserCreate, UserResponse
-from passlib.context import CryptContext
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.auth import invalidate_principal
+from app import response_cache
+from app.passwords import hash_password
 
 router = APIRouter()
 
 # Listar todos los usuarios
 @router.get("/users", response_model=list[UserResponse])
-def get_users(db: Session = Depends(get_db)):
-    return db.query(User).all()
+async def get_users(db: AsyncSession = Depends(get_read_db)):
+    return (await db.execute(select(User))).scalars().all()
 
 # Obtener un usuario por ID
 @router.get("/users/{id}", response_model=UserResponse)
-def get_user(id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == id).first()
+async def get_user(id: int, db: AsyncSession = Depends(get_read_db)):
+    user = await db.get(User, id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 # Actualizar un usuario por ID
 @router.put("/users/{id}", response_model=UserResponse)
-def update_user(id: int, user: UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.id == id).first()
+async def update_user(id: int, user: UserCreate, db: AsyncSession = Depends(get_db)):
+    db_user = await db.get(User, id)
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
     # Como el esquema ya normaliza username y email, estos valores vienen en minúsculas
     db_user.username = user.username
     db_user.email = user.email
-    # Re-hashear la contraseña antes de actualizarla
-    db_user.hashed_password = pwd_context.hash(user.password)
-    db.commit()
-    db.refresh(db_user)
+    # Re-hashear la contraseña antes de actualizarla (bcrypt en el pool acotado)
+    db_user.hashed_password = await run_password_task(hash_password, user.password)
+    await db.commit()
+    invalidate_principal(id)
+    # Los posts cacheados incluyen los datos del autor
+    response_cache.invalidate_all()
     return db_user
 
 # Eliminar un usuario por ID
 @router.delete("/users/{id}")
-def delete_user(id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == id).first()
+async def delete_user(id: int, db: AsyncSession = Depends(get_db)):
+    user = await db.get(User, id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    db.delete(user)
-    db.commit()
+    await db.delete(user)
+    await db.commit()
+    invalidate_principal(id)
+    response_cache.invalidate_all()
     return {"message": "User deleted successfully"}
 
 # Crear un nuevo usuario
 @router.post("/users", response_model=UserResponse)
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
-    existing_user = db.query(User).filter(
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
+    existing_user = (await db.execute(select(User).where(
         (User.email == user.email) | (User.username == user.username)
-    ).first()
+    ))).scalars().first()
     if existing_user:
         raise HTTPException(
             status_code=400, 
             detail="Email or username already registered"
         )
 
-    hashed_password = pwd_context.hash(user.password)
+    hashed_password = await run_password_task(hash_password, user.password)
     db_user = User(
         username=user.username,
         email=user.email,
@@ -68,7 +74,6 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
     )
 
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
 
     return db_user
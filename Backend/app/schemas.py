@@ -1,9 +1,6 @@
 from pydantic import BaseModel, Field, EmailStr, field_validator
 from datetime import datetime
-from typing import Optional, List
-from passlib.context import CryptContext
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from typing import Annotated, Optional, List, Union
 
 # ✅ User Schema with Safe Validations
 class UserBase(BaseModel):
@@ -66,6 +63,8 @@ class RatingCreate(RatingBase):
 class RatingResponse(BaseModel):
     new_average: float
 
+TagName = Annotated[str, Field(min_length=2, max_length=50, pattern=r"^[a-zA-Z0-9_ -]+$")]
+
 class TagBase(BaseModel):
     name: str = Field(
         ..., 
@@ -83,6 +82,11 @@ class TagResponse(TagBase):
     class Config:
         from_attributes = True
 
+class TagStats(BaseModel):
+    id: int
+    name: str
+    post_count: int
+
 class AuthorResponse(BaseModel):
     id: int
     username: str
@@ -107,9 +111,85 @@ class PostResponse(PostBase):
     class Config:
         from_attributes = True  
 
+# Listados: autor compacto (sin datos sensibles) y la calificación del usuario actual
+class PostListItem(BaseModel):
+    id: int
+    title: str
+    content: str
+    is_published: bool
+    created_at: datetime
+    updated_at: Optional[datetime]
+    author_id: Optional[int]
+    author: Optional[AuthorResponse]
+    tags: List[TagResponse] = []
+    rating_count: int = 0
+    average_rating: Optional[float] = None
+    user_rating: Optional[float] = None
+
+    class Config:
+        from_attributes = True
+
+class AuthorSummary(BaseModel):
+    id: int
+    username: str
+
+    class Config:
+        from_attributes = True
+
+# view=summary: sin contenido completo, solo el resumen guardado en posts.excerpt
+class PostSummaryItem(BaseModel):
+    id: int
+    title: str
+    excerpt: Optional[str] = None
+    is_published: bool
+    created_at: datetime
+    updated_at: Optional[datetime]
+    author_id: Optional[int]
+    author: Optional[AuthorSummary]
+    tags: List[TagResponse] = []
+    rating_count: int = 0
+    average_rating: Optional[float] = None
+    user_rating: Optional[float] = None
+
+    class Config:
+        from_attributes = True
+
+class LeaderboardItem(PostSummaryItem):
+    score: float = 0.0
+
+class LeaderboardResponse(BaseModel):
+    posts: List[LeaderboardItem]
+
+class PostListResponse(BaseModel):
+    total: Optional[int]
+    page: Optional[int]
+    size: int
+    next_cursor: Optional[str] = None
+    posts: List[Union[PostListItem, PostSummaryItem]]
+
+class PostSearchItem(PostListItem):
+    rank: float = 0.0
+
+class PostSearchResponse(BaseModel):
+    total: Optional[int]
+    page: int
+    size: int
+    posts: List[PostSearchItem]
+
 class PostCreate(PostBase):
     author_id: int = Field(..., gt=0)
     tag_ids: List[int] = Field(default=[])
+    tag_names: List[TagName] = Field(default=[])  # se crean si no existen
+
+class BulkRowError(BaseModel):
+    index: int
+    errors: List[dict]
+
+class BulkResponse(BaseModel):
+    received: int
+    accepted: int
+    failed: int
+    errors: List[BulkRowError] = []
 
 class TokenResponse(BaseModel):
     access_token: str
@@ -0,0 +1,53 @@
+from sqlalchemy import func, literal_column, or_, select, table, column
+from sqlalchemy.sql import Select
+
+from app.models import Post
+
+# Configuración de texto de PostgreSQL; 'simple' no aplica stemming y sirve para
+# contenido en cualquier idioma. Debe coincidir con la usada en search_vector.
+SEARCH_CONFIG = "simple"
+
+_posts_fts = table("posts_fts", column("rowid"))
+
+# Motores con índice de texto completo (tsvector / FTS5); la ruta responde 501 en los demás
+SUPPORTED_DIALECTS = ("postgresql", "sqlite")
+
+
+def is_supported(dialect_name: str) -> bool:
+    return dialect_name in SUPPORTED_DIALECTS
+
+
+def _fts5_match(q: str) -> str:
+    """Convierte el texto del usuario en una consulta FTS5 segura (AND de términos literales)."""
+    terms = [term.replace('"', '""') for term in q.split()]
+    return " ".join(f'"{term}"' for term in terms)
+
+
+def search_posts(dialect_name: str, q: str) -> Select:
+    """SELECT de (Post, rank) que coincide con ``q``, ordenado por relevancia descendente.
+
+    Solo para dialectos de SUPPORTED_DIALECTS (compruébese antes con ``is_supported``).
+    """
+    if dialect_name == "postgresql":
+        tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+        search_vector = literal_column("posts.search_vector")
+        rank = func.ts_rank_cd(search_vector, tsquery)
+        return (
+            select(Post, rank.label("rank"))
+            .where(search_vector.op("@@")(tsquery))
+            .order_by(rank.desc(), Post.id.desc())
+        )
+
+    # SQLite: bm25 devuelve valores menores para mejores coincidencias; el título pesa más
+    rank = -func.bm25(literal_column("posts_fts"), 10.0, 1.0)
+    return (
+        select(Post, rank.label("rank"))
+        .join(_posts_fts, _posts_fts.c.rowid == Post.id)
+        .where(literal_column("posts_fts").op("MATCH")(_fts5_match(q)))
+        .order_by(rank.desc(), Post.id.desc())
+    )
+
+
+def visible_to(user_id: int):
+    """Posts publicados más los borradores propios del usuario."""
+    return or_(Post.is_published == True, Post.author_id == user_id)  # noqa: E712
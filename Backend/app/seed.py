@@ -0,0 +1,218 @@
+"""Generador de datos sintéticos para pruebas de escala y benchmarks.
+
+Inserta usuarios, etiquetas, posts, enlaces post_tags y calificaciones con inserts
+de Core por bloques, sin pasar por la API (un único hash bcrypt para todos los
+usuarios). La distribución imita a producción: calificaciones por post según una
+ley de Zipf y popularidad de etiquetas con cola larga. Las fechas se sortean hacia
+atrás desde una referencia fija (las calificaciones, en los últimos ``--rating-days``
+días, nunca antes que su post), así que con la misma ``--seed`` y los mismos tamaños
+los datos generados son idénticos.
+
+Uso (desde Backend/, con la base ya migrada):
+    python -m app.seed --users 10000 --posts 1000000 --ratings 5000000 --seed 42
+"""
+import argparse
+import bisect
+import itertools
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select, text
+
+from app.passwords import hash_password
+from app.database import Base, engine
+from app.models import Post, Rating, Tag, User, make_excerpt, post_tags, tag_count_params, tag_post_count_update
+
+DEFAULT_PASSWORD = "SeedPassw0rd"
+
+_WORDS = (
+    "cloud security kubernetes python fastapi postgres cache index latency query network "
+    "encryption token identity policy storage backup monitoring alert deploy container "
+    "serverless lambda bucket firewall audit compliance incident threat vulnerability patch "
+    "pipeline terraform ansible docker cluster replica shard queue stream event metric trace"
+).split()
+
+# Valores de calificación y su peso: la mayoría de usuarios califica alto
+_RATING_VALUES = (1.0, 2.0, 3.0, 4.0, 5.0)
+_RATING_WEIGHTS = (5, 8, 17, 35, 35)
+
+
+def _zipf_cumulative(n: int, s: float):
+    """Pesos acumulados 1/k^s para k = 1..n (para muestrear con bisect)."""
+    return list(itertools.accumulate(1.0 / k ** s for k in range(1, n + 1)))
+
+
+def _harmonic(n: int, s: float) -> float:
+    return sum(1.0 / k ** s for k in range(1, n + 1))
+
+
+def _next_id(connection, table) -> int:
+    return (connection.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+
+
+def _sample_tags(rng: random.Random, cumulative, first_tag_id: int, count: int):
+    """Etiquetas distintas para un post, con probabilidad proporcional a su popularidad (Zipf)."""
+    total = cumulative[-1]
+    chosen = set()
+    for _ in range(count * 3):
+        chosen.add(first_tag_id + bisect.bisect_left(cumulative, rng.random() * total))
+        if len(chosen) == count:
+            break
+    return chosen
+
+
+def _sync_sequences(connection):
+    # Los ids se insertan explícitamente: en PostgreSQL hay que avanzar las secuencias
+    if connection.dialect.name != "postgresql":
+        return
+    for table in ("users", "tags", "posts", "ratings"):
+        connection.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE((SELECT MAX(id) FROM {table}), 1))"
+        ))
+
+
+def generate(
+    users: int,
+    tags: int,
+    posts: int,
+    ratings: int,
+    max_tags_per_post: int = 5,
+    zipf_s: float = 1.1,
+    published_ratio: float = 0.9,
+    rating_days: float = 90,
+    reference: datetime = datetime(2026, 1, 1),
+    chunk_size: int = 5000,
+    seed: int = 42,
+    password: str = DEFAULT_PASSWORD,
+    bind=engine,
+) -> dict:
+    """Genera el dataset y devuelve el número de filas insertadas por tabla."""
+    rng = random.Random(seed)
+    hashed_password = hash_password(password)
+    now = reference
+    counts = {"users": 0, "tags": 0, "posts": 0, "post_tags": 0, "ratings": 0}
+
+    with bind.begin() as connection:
+        first_user = _next_id(connection, User.__table__)
+        first_tag = _next_id(connection, Tag.__table__)
+        first_post = _next_id(connection, Post.__table__)
+        next_rating = _next_id(connection, Rating.__table__)
+
+    def write(table, rows, connection):
+        for start in range(0, len(rows), chunk_size):
+            connection.execute(insert(table), rows[start:start + chunk_size])
+
+    # Usuarios y etiquetas
+    for start in range(0, users, chunk_size):
+        with bind.begin() as connection:
+            write(User.__table__, [{
+                "id": first_user + i,
+                "username": f"user{first_user + i}",
+                "email": f"user{first_user + i}@example.com",
+                "hashed_password": hashed_password,
+                "password_reminder": "seed data",
+                "created_at": now - timedelta(days=365),
+            } for i in range(start, min(start + chunk_size, users))], connection)
+    counts["users"] = users
+
+    with bind.begin() as connection:
+        write(Tag.__table__, [{"id": first_tag + i, "name": f"tag{first_tag + i}"} for i in range(tags)], connection)
+    counts["tags"] = tags
+
+    tag_cumulative = _zipf_cumulative(tags, zipf_s) if tags else None
+    rating_scale = ratings / _harmonic(posts, zipf_s) if posts else 0
+    user_ids = range(first_user, first_user + users)
+    tag_post_counts = {}
+
+    # Posts por bloques: cada bloque (posts + post_tags + ratings) en su propia transacción
+    for start in range(0, posts, chunk_size):
+        post_rows, link_rows, rating_rows = [], [], []
+        for i in range(start, min(start + chunk_size, posts)):
+            post_id = first_post + i
+            created_at = now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600))
+            content = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(30, 150)))
+
+            # Calificaciones: el post de "rango" k recibe ~ ratings / (H * k^s)
+            rank = rng.randint(1, posts)
+            rating_count = min(users, int(rating_scale / rank ** zipf_s + rng.random()))
+            values = rng.choices(_RATING_VALUES, weights=_RATING_WEIGHTS, k=rating_count)
+            rating_span = min(rating_days * 24 * 3600, (now - created_at).total_seconds())
+            for user_id, value in zip(rng.sample(user_ids, rating_count), values):
+                rating_rows.append({
+                    "id": next_rating, "post_id": post_id, "user_id": user_id, "rating": value,
+                    "rated_at": now - timedelta(seconds=rng.uniform(0, rating_span)),
+                })
+                next_rating += 1
+
+            post_rows.append({
+                "id": post_id,
+                "title": " ".join(rng.choice(_WORDS) for _ in range(rng.randint(3, 8))).capitalize(),
+                "content": content,
+                "excerpt": make_excerpt(content),
+                "is_published": rng.random() < published_ratio,
+                "created_at": created_at,
+                "author_id": rng.choice(user_ids) if users else None,
+                "rating_count": rating_count,
+                "rating_sum": sum(values),
+            })
+            if tags:
+                for tag_id in _sample_tags(rng, tag_cumulative, first_tag, rng.randint(0, max_tags_per_post)):
+                    link_rows.append({"post_id": post_id, "tag_id": tag_id})
+                    if post_rows[-1]["is_published"]:
+                        tag_post_counts[tag_id] = tag_post_counts.get(tag_id, 0) + 1
+
+        with bind.begin() as connection:
+            write(Post.__table__, post_rows, connection)
+            write(post_tags, link_rows, connection)
+            write(Rating.__table__, rating_rows, connection)
+        counts["posts"] += len(post_rows)
+        counts["post_tags"] += len(link_rows)
+        counts["ratings"] += len(rating_rows)
+
+    with bind.begin() as connection:
+        # tags.post_count (posts publicados por etiqueta) no pasa por los eventos del ORM
+        params = tag_count_params(tag_post_counts)
+        if params:
+            connection.execute(tag_post_count_update, params)
+        _sync_sequences(connection)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--tags", type=int, default=500)
+    parser.add_argument("--posts", type=int, default=10000)
+    parser.add_argument("--ratings", type=int, default=50000, help="Total aproximado de calificaciones")
+    parser.add_argument("--max-tags-per-post", type=int, default=5)
+    parser.add_argument("--zipf-s", type=float, default=1.1, help="Exponente de Zipf (calificaciones y etiquetas)")
+    parser.add_argument("--published-ratio", type=float, default=0.9)
+    parser.add_argument("--rating-days", type=float, default=90, help="Antigüedad máxima de las calificaciones")
+    parser.add_argument(
+        "--reference-date", type=datetime.fromisoformat, default=datetime(2026, 1, 1),
+        help="Fecha (UTC) desde la que se sortean las fechas hacia atrás; p. ej. hoy para ejercitar /posts/trending",
+    )
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--password", default=DEFAULT_PASSWORD, help="Contraseña común de los usuarios generados")
+    parser.add_argument("--create-schema", action="store_true", help="Crear las tablas (bases locales sin Alembic)")
+    args = parser.parse_args()
+
+    if args.create_schema:
+        Base.metadata.create_all(engine)
+
+    start = time.perf_counter()
+    counts = generate(
+        users=args.users, tags=args.tags, posts=args.posts, ratings=args.ratings,
+        max_tags_per_post=args.max_tags_per_post, zipf_s=args.zipf_s,
+        published_ratio=args.published_ratio, rating_days=args.rating_days,
+        reference=args.reference_date, chunk_size=args.chunk_size,
+        seed=args.seed, password=args.password,
+    )
+    print(json.dumps({"rows": counts, "seconds": round(time.perf_counter() - start, 1)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+
+class FastJSONResponse(JSONResponse):
+    """Respuesta JSON codificada por pydantic-core (Rust) en lugar de json.dumps.
+
+    Es la clase por defecto de la app. Las rutas calientes construyen su modelo de
+    respuesta directamente desde las filas ORM y lo devuelven envuelto en esta clase:
+    FastAPI no vuelve a validarlo contra ``response_model`` y se codifica una sola vez.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
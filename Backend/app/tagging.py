@@ -0,0 +1,55 @@
+from typing import Iterable, List
+
+from sqlalchemy import or_, select, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Tag
+
+
+async def get_or_create_tags(
+    db: AsyncSession, names: Iterable[str] = (), tag_ids: Iterable[int] = ()
+) -> List[Tag]:
+    """Devuelve las etiquetas de ``tag_ids`` y las de ``names``, creando las que no existan.
+
+    En PostgreSQL es una sola sentencia: ``INSERT ... ON CONFLICT (name) DO NOTHING
+    RETURNING`` en un CTE unido a las etiquetas ya existentes. No hace commit.
+    """
+    names = list(dict.fromkeys(names))
+    tag_ids = list(dict.fromkeys(tag_ids))
+    if not names and not tag_ids:
+        return []
+
+    tags = Tag.__table__
+    existing = select(tags.c.id, tags.c.name).where(
+        or_(tags.c.name.in_(names), tags.c.id.in_(tag_ids))
+    )
+    dialect_name = db.bind.dialect.name
+
+    if names and dialect_name == "postgresql":
+        inserted = (
+            pg_insert(tags)
+            .values([{"name": name} for name in names])
+            .on_conflict_do_nothing(index_elements=["name"])
+            .returning(tags.c.id, tags.c.name)
+            .cte("inserted_tags")
+        )
+        # El SELECT del CTE no ve las filas recién insertadas: UNION ALL no duplica
+        statement = union_all(select(inserted.c.id, inserted.c.name), existing)
+    else:
+        if names:
+            # SQLAlchemy 1.4 no soporta RETURNING en SQLite: insertar y luego leer
+            await db.execute(
+                sqlite_insert(tags).on_conflict_do_nothing(index_elements=["name"]),
+                [{"name": name} for name in names],
+            )
+        statement = existing
+
+    result = list((await db.execute(select(Tag).from_statement(statement))).scalars())
+
+    missing = set(names) - {tag.name for tag in result}
+    if missing:
+        # Creadas por otra transacción después de nuestro snapshot (ON CONFLICT las omitió)
+        result += (await db.execute(select(Tag).where(Tag.name.in_(missing)))).scalars().all()
+    return result
@@ -0,0 +1 @@
+# Scripts de benchmark del backend; se ejecutan con `python -m benchmarks.<nombre>` desde Backend/
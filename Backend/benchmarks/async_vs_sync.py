@@ -0,0 +1,133 @@
+"""Compara el throughput de una ruta síncrona (threadpool) y una asíncrona (AsyncSession).
+
+Ambas rutas ejecutan la misma consulta contra DATABASE_URL. En PostgreSQL la consulta
+espera ``--query-ms`` con ``pg_sleep`` para simular la latencia de RDS; en SQLite se
+ejecuta un ``SELECT 1``.
+
+Uso (desde Backend/):
+    python -m benchmarks.async_vs_sync --clients 200 --requests 4000 --query-ms 20
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.database import ASYNC_DATABASE_URL, DATABASE_URL, _async_connect_args
+
+
+def _pool_args(pool_size: int) -> dict:
+    # SQLite usa NullPool/StaticPool y no acepta parámetros de pool
+    if DATABASE_URL.startswith("sqlite"):
+        return {}
+    return {"pool_size": pool_size, "max_overflow": 0}
+
+
+def _sync_connect_args() -> dict:
+    # La dependencia síncrona abre y cierra la sesión en hilos distintos del threadpool
+    if DATABASE_URL.startswith("sqlite"):
+        return {"check_same_thread": False}
+    return {}
+
+
+def _query(dialect: str, query_ms: int):
+    if dialect == "postgresql" and query_ms:
+        return text("SELECT pg_sleep(:s)").bindparams(s=query_ms / 1000)
+    return text("SELECT 1")
+
+
+def build_sync_app(pool_size: int, query_ms: int) -> FastAPI:
+    engine = create_engine(DATABASE_URL, connect_args=_sync_connect_args(), **_pool_args(pool_size))
+    session_factory = sessionmaker(bind=engine)
+    stmt = _query(engine.dialect.name, query_ms)
+
+    def get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+
+    @app.get("/bench")
+    def bench(db: Session = Depends(get_db)):
+        db.execute(stmt)
+        return {"ok": True}
+
+    return app
+
+
+def build_async_app(pool_size: int, query_ms: int) -> FastAPI:
+    engine = create_async_engine(
+        ASYNC_DATABASE_URL, connect_args=_async_connect_args, **_pool_args(pool_size)
+    )
+    session_factory = sessionmaker(engine, class_=AsyncSession)
+    stmt = _query(engine.dialect.name, query_ms)
+
+    async def get_db():
+        async with session_factory() as db:
+            yield db
+
+    app = FastAPI()
+
+    @app.get("/bench")
+    async def bench(db: AsyncSession = Depends(get_db)):
+        await db.execute(stmt)
+        return {"ok": True}
+
+    return app
+
+
+async def drive(app: FastAPI, clients: int, total_requests: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    latencies = []
+    remaining = iter(range(total_requests))
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get("/bench")  # calentar el pool
+
+        async def worker():
+            for _ in remaining:
+                start = time.perf_counter()
+                response = await client.get("/bench")
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--query-ms", type=int, default=20)
+    parser.add_argument("--pool-size", type=int, default=50)
+    args = parser.parse_args()
+
+    results = {}
+    for name, factory in (("sync", build_sync_app), ("async", build_async_app)):
+        app = factory(args.pool_size, args.query_ms)
+        results[name] = asyncio.run(drive(app, args.clients, args.requests))
+
+    print(json.dumps({"clients": args.clients, "query_ms": args.query_ms, **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
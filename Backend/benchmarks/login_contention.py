@@ -0,0 +1,103 @@
+"""Throughput de login frente a la latencia del resto de rutas mientras hay logins en curso.
+
+Levanta ``app.main:app`` en proceso contra una base SQLite temporal, lanza
+``--login-clients`` clientes haciendo login en bucle y, en paralelo, mide la
+latencia de ``GET /tags/tags`` con ``--read-clients`` clientes. Para comparar
+configuraciones del pool de bcrypt se ejecuta varias veces variando
+PASSWORD_HASH_WORKERS / PASSWORD_HASH_MAX_PENDING.
+
+Uso (desde Backend/):
+    PASSWORD_HASH_WORKERS=2 python -m benchmarks.login_contention --seconds 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix="bench-login-"), "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+import httpx  # noqa: E402
+
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Tag, User  # noqa: E402
+from app.passwords import hash_password  # noqa: E402
+
+PASSWORD = "BenchPassw0rd"
+
+
+def seed():
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        db.add(User(
+            username="bench", email="bench@example.com",
+            hashed_password=hash_password(PASSWORD), password_reminder="benchmark",
+        ))
+        db.add_all(Tag(name=f"tag{i}") for i in range(20))
+        db.commit()
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[max(int(len(values) * q) - 1, 0)] if values else 0.0
+
+
+async def run(seconds: float, login_clients: int, read_clients: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    logins, rejected, read_latencies = [], 0, []
+    deadline = time.perf_counter() + seconds
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def login_worker():
+            nonlocal rejected
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                response = await client.post("/auth/login", data={"username": "bench", "password": PASSWORD})
+                if response.status_code == 503:
+                    rejected += 1
+                    await asyncio.sleep(0.05)
+                    continue
+                response.raise_for_status()
+                logins.append(time.perf_counter() - start)
+
+        async def read_worker():
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                (await client.get("/tags/tags")).raise_for_status()
+                read_latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(
+            *(login_worker() for _ in range(login_clients)),
+            *(read_worker() for _ in range(read_clients)),
+        )
+
+    return {
+        "logins_per_sec": round(len(logins) / seconds, 2),
+        "login_p50_ms": round(statistics.median(logins) * 1000, 2) if logins else None,
+        "logins_rejected_503": rejected,
+        "read_requests": len(read_latencies),
+        "read_p50_ms": round(statistics.median(read_latencies) * 1000, 2) if read_latencies else None,
+        "read_p99_ms": round(_percentile(read_latencies, 0.99) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--login-clients", type=int, default=50)
+    parser.add_argument("--read-clients", type=int, default=10)
+    args = parser.parse_args()
+
+    seed()
+    from app.password_pool import password_pool_status
+
+    result = asyncio.run(run(args.seconds, args.login_clients, args.read_clients))
+    print(json.dumps({"password_pool": password_pool_status(), **result}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Sobrecoste por petición de MetricsMiddleware.
+
+Compara la misma app mínima (una ruta con parámetro que devuelve un JSON pequeño)
+con y sin ``MetricsMiddleware``, ejecutadas en proceso con httpx.ASGITransport.
+Al ser una ruta casi vacía, la diferencia es el coste del middleware y de los
+eventos de SQLAlchemy que no se disparan aquí.
+
+Uso (desde Backend/):
+    python -m benchmarks.metrics_overhead --requests 20000 --clients 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from app.metrics import MetricsMiddleware, registry, render_metrics  # noqa: E402
+
+
+def build_app(with_metrics: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    if with_metrics:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def drive(app: FastAPI, clients: int, total_requests: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    remaining = iter(range(total_requests))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get("/items/0")
+
+        async def worker():
+            for i in remaining:
+                (await client.get(f"/items/{i}")).raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    timings = {"without": [], "with": []}
+    for _ in range(args.rounds):
+        # Rondas alternadas para que el ruido del sistema afecte a ambas variantes por igual
+        for name, with_metrics in (("without", False), ("with", True)):
+            timings[name].append(asyncio.run(drive(build_app(with_metrics), args.clients, args.requests)))
+
+    per_request = {name: statistics.median(values) / args.requests * 1e6 for name, values in timings.items()}
+    start = time.perf_counter()
+    render_metrics()
+    render_ms = (time.perf_counter() - start) * 1000
+
+    print(json.dumps({
+        "requests": args.requests,
+        "us_per_request_without": round(per_request["without"], 1),
+        "us_per_request_with": round(per_request["with"], 1),
+        "overhead_us": round(per_request["with"] - per_request["without"], 1),
+        "overhead_pct": round((per_request["with"] / per_request["without"] - 1) * 100, 1),
+        "series": len(registry.series),
+        "render_ms": round(render_ms, 3),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Dobles envíos simultáneos de POST /ratings/ratings: sin errores 500 y contadores exactos.
+
+Cada usuario lanza ``--submits`` calificaciones a la vez sobre el mismo post (el doble
+clic del frontend) para ``--rounds`` posts elegidos al azar, con todos los usuarios en
+paralelo. Al terminar comprueba que ninguna respuesta fue 5xx, que no hay filas
+duplicadas por (post_id, user_id) y que posts.rating_count / rating_sum coinciden con
+la tabla ratings. Sale con código 1 si alguna comprobación falla.
+
+Por defecto usa una SQLite temporal; la concurrencia real (bloqueos de fila) solo se
+ejercita contra PostgreSQL con ``--database-url`` (base migrada y sembrada con
+``python -m app.seed --password BenchPassw0rd``). SQLite admite un solo escritor: con
+muchos más usuarios en paralelo aparecen "database is locked" por el busy timeout (5 s).
+
+Uso (desde Backend/):
+    python -m benchmarks.rate_contention --users 10 --rounds 20 --submits 3
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+PASSWORD = "BenchPassw0rd"
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="Base ya migrada y sembrada; por defecto una SQLite temporal")
+    parser.add_argument("--users", type=int, default=10, help="Usuarios calificando en paralelo")
+    parser.add_argument("--posts", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=20, help="Posts calificados por cada usuario")
+    parser.add_argument("--submits", type=int, default=3, help="Envíos simultáneos por calificación")
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+
+def seed(args):
+    from app.database import Base, engine
+    from app.seed import generate
+
+    Base.metadata.create_all(engine)
+    generate(users=args.users, tags=10, posts=args.posts, ratings=args.posts * 2, seed=args.seed, password=PASSWORD)
+
+
+async def check_consistency() -> dict:
+    from sqlalchemy import func, select
+
+    from app.database import AsyncSessionLocal
+    from app.models import Post, Rating
+
+    async with AsyncSessionLocal() as db:
+        duplicates = (await db.execute(
+            select(func.count()).select_from(
+                select(Rating.post_id, Rating.user_id)
+                .group_by(Rating.post_id, Rating.user_id)
+                .having(func.count() > 1)
+                .subquery()
+            )
+        )).scalar()
+        actual = (
+            select(Rating.post_id, func.count().label("n"), func.sum(Rating.rating).label("total"))
+            .group_by(Rating.post_id)
+            .subquery()
+        )
+        mismatched = (await db.execute(
+            select(func.count())
+            .select_from(Post)
+            .outerjoin(actual, actual.c.post_id == Post.id)
+            .where(
+                (Post.rating_count != func.coalesce(actual.c.n, 0))
+                | (func.abs(Post.rating_sum - func.coalesce(actual.c.total, 0)) > 1e-6)
+            )
+        )).scalar()
+    return {"duplicate_ratings": duplicates, "posts_with_wrong_counters": mismatched}
+
+
+async def run(args, rng: random.Random) -> dict:
+    import httpx
+    from sqlalchemy import select
+
+    from app.database import AsyncSessionLocal, async_engine
+    from app.main import app
+    from app.models import Post, User
+    from benchmarks.routes import StatementCounter
+
+    async with AsyncSessionLocal() as db:
+        post_ids = (await db.execute(select(Post.id).limit(args.posts))).scalars().all()
+        usernames = (await db.execute(select(User.username).order_by(User.id).limit(args.users))).scalars().all()
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    statuses, latencies = {}, []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        headers = []
+        for username in usernames:
+            login = await client.post("/auth/login", data={"username": username, "password": PASSWORD})
+            login.raise_for_status()
+            headers.append({"Authorization": f"Bearer {login.json()['access_token']}"})
+
+        async def submit(user_headers, post_id):
+            start = time.perf_counter()
+            response = await client.post(
+                "/ratings/ratings", json={"post_id": post_id, "rating": rng.randint(1, 5)}, headers=user_headers
+            )
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        async def user_worker(user_headers):
+            for post_id in rng.sample(post_ids, min(args.rounds, len(post_ids))):
+                await asyncio.gather(*(submit(user_headers, post_id) for _ in range(args.submits)))
+
+        counter = StatementCounter(async_engine)
+        start = time.perf_counter()
+        await asyncio.gather(*(user_worker(user_headers) for user_headers in headers))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "requests": len(latencies),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "sql_per_request": round(counter.count / len(latencies), 2),
+        **await check_consistency(),
+    }
+
+
+def main():
+    args = _parse_args()
+    rng = random.Random(args.seed)
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        path = os.path.join(tempfile.mkdtemp(prefix="bench-ratings-"), "bench.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+        seed(args)
+
+    result = asyncio.run(run(args, rng))
+    print(json.dumps(result, indent=2))
+
+    server_errors = sum(count for status, count in result["statuses"].items() if status.startswith("5"))
+    if server_errors or result["duplicate_ratings"] or result["posts_with_wrong_counters"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
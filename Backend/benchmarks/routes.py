@@ -0,0 +1,211 @@
+"""Latencia (p50/p95/p99), throughput y sentencias SQL por petición de las rutas principales.
+
+Levanta ``app.main:app`` en proceso contra una base SQLite temporal sembrada con
+``app.seed`` (o la base de ``--database-url``, p. ej. un PostgreSQL local ya migrado
+y sembrado con ``python -m app.seed --password BenchPassw0rd``) y ejecuta cada
+escenario por separado con ``--concurrency`` clientes. El resultado es JSON; con
+``--output`` se guarda y con ``--baseline`` se compara contra una ejecución anterior
+(sale con código 1 si algún escenario empeora más de ``--threshold`` por ciento).
+
+Uso (desde Backend/):
+    python -m benchmarks.routes --requests 500 --concurrency 20 --output baseline.json
+    python -m benchmarks.routes --requests 500 --concurrency 20 --baseline baseline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="Base ya migrada; por defecto una SQLite temporal sembrada")
+    parser.add_argument("--routes", default=",".join(SCENARIOS), help="Escenarios separados por comas")
+    parser.add_argument("--requests", type=int, default=500, help="Peticiones por escenario")
+    parser.add_argument("--login-requests", type=int, default=50, help="Peticiones de login (bcrypt es lento)")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--users", type=int, default=200, help="Tamaños del dataset de app.seed (base temporal)")
+    parser.add_argument("--tags", type=int, default=100)
+    parser.add_argument("--posts", type=int, default=5000)
+    parser.add_argument("--ratings", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Guardar el resultado en este fichero")
+    parser.add_argument("--baseline", help="Resultado anterior contra el que comparar")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Empeoramiento tolerado en %%")
+    return parser.parse_args()
+
+
+PASSWORD = "BenchPassw0rd"
+USERNAME = "user1"  # primer usuario generado por app.seed
+
+# Cada escenario recibe (client, headers, rng, post_ids) y hace una petición
+SCENARIOS = {
+    "login": lambda client, headers, rng, post_ids: client.post(
+        "/auth/login", data={"username": USERNAME, "password": PASSWORD}
+    ),
+    "list_posts": lambda client, headers, rng, post_ids: client.get(
+        f"/posts/posts?page={rng.randint(1, 20)}&size=20", headers=headers
+    ),
+    "get_post": lambda client, headers, rng, post_ids: client.get(
+        f"/posts/posts/{rng.choice(post_ids)}", headers=headers
+    ),
+    "rate_post": lambda client, headers, rng, post_ids: client.post(
+        "/ratings/ratings", json={"post_id": rng.choice(post_ids), "rating": rng.randint(1, 5)}, headers=headers
+    ),
+    "create_post": lambda client, headers, rng, post_ids: client.post(
+        "/posts/posts",
+        json={"title": "Benchmark post", "content": "benchmark content " * 20, "author_id": 1, "tag_ids": [1, 2]},
+        headers=headers,
+    ),
+    "tags": lambda client, headers, rng, post_ids: client.get("/tags/tags", headers=headers),
+}
+
+
+def seed(args):
+    from app.database import Base, engine
+    from app.seed import generate
+
+    Base.metadata.create_all(engine)
+    return generate(
+        users=args.users, tags=args.tags, posts=args.posts, ratings=args.ratings,
+        seed=args.seed, password=PASSWORD,
+    )
+
+
+def _percentile(values, q):
+    return values[max(int(round(len(values) * q)) - 1, 0)] if values else 0.0
+
+
+class StatementCounter:
+    """Cuenta las sentencias SQL que ejecuta el motor asíncrono de la app."""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+async def run_scenario(client, name, headers, post_ids, total_requests, concurrency, counter, rng) -> dict:
+    scenario = SCENARIOS[name]
+    await scenario(client, headers, rng, post_ids)  # calentamiento
+    latencies, errors = [], 0
+    remaining = iter(range(total_requests))
+    counter.count = 0
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await scenario(client, headers, rng, post_ids)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 2),
+        "sql_per_request": round(counter.count / len(latencies), 2),
+    }
+
+
+async def run(args, rng: random.Random) -> dict:
+    import httpx
+    from sqlalchemy import select
+
+    from app.database import AsyncSessionLocal, async_engine
+    from app.main import app
+    from app.models import Post
+
+    async with AsyncSessionLocal() as db:
+        post_ids = (await db.execute(select(Post.id).limit(10000))).scalars().all()
+
+    counter = StatementCounter(async_engine)
+    results = {}
+    # Los errores de la app cuentan como respuestas 500 en lugar de abortar la ejecución
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        login = await client.post("/auth/login", data={"username": USERNAME, "password": PASSWORD})
+        login.raise_for_status()
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        for name in args.routes.split(","):
+            total = args.login_requests if name == "login" else args.requests
+            results[name] = await run_scenario(
+                client, name, headers, post_ids, total, args.concurrency, counter, rng
+            )
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> dict:
+    """Variación porcentual frente al baseline; marca los escenarios que empeoran más de ``threshold``."""
+    report = {}
+    for name, current in results.items():
+        previous = baseline.get("routes", {}).get(name)
+        if not previous:
+            continue
+        delta = {
+            metric: round((current[metric] - previous[metric]) / previous[metric] * 100, 1)
+            for metric in ("p50_ms", "p95_ms", "p99_ms", "rps", "sql_per_request")
+            if previous.get(metric)
+        }
+        regressed = (
+            delta.get("p50_ms", 0) > threshold
+            or delta.get("p99_ms", 0) > threshold
+            or delta.get("rps", 0) < -threshold
+            or current["sql_per_request"] > previous.get("sql_per_request", 0)
+        )
+        report[name] = {"delta_pct": delta, "regressed": regressed}
+    return report
+
+
+def main():
+    args = _parse_args()
+    rng = random.Random(args.seed)
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        path = os.path.join(tempfile.mkdtemp(prefix="bench-routes-"), "bench.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+        seed(args)
+
+    results = asyncio.run(run(args, rng))
+    output = {
+        "database": os.environ["DATABASE_URL"].split(":", 1)[0],
+        "concurrency": args.concurrency,
+        "routes": results,
+    }
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            output["comparison"] = compare(results, json.load(f), args.threshold)
+
+    print(json.dumps(output, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(output, f, indent=2)
+
+    if any(entry["regressed"] for entry in output.get("comparison", {}).values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Coste de serializar una página de 100 posts: jsonable_encoder frente a los modelos de respuesta.
+
+Construye en memoria (sin base de datos) ``--posts`` objetos Post con autor y
+etiquetas y mide, por petición simulada:
+
+- ``jsonable_encoder``: el camino anterior de ``_paginate_posts`` (tres llamadas a
+  jsonable_encoder por post, dict validado contra ``response_model=dict`` y
+  codificado con json.dumps por JSONResponse).
+- ``pydantic``: ``PostListItem`` desde el ORM y ``FastJSONResponse`` (pydantic-core).
+
+Uso (desde Backend/):
+    python -m benchmarks.serialization --posts 100 --repeat 500
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from datetime import datetime
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from sqlalchemy.orm.attributes import set_committed_value  # noqa: E402
+
+from app.models import Post, Tag, User  # noqa: E402
+from app.schemas import PostListItem, PostListResponse  # noqa: E402
+from app.serialization import FastJSONResponse  # noqa: E402
+
+
+def build_posts(count: int):
+    """Posts como los deja _paginate_posts: autor y etiquetas cargados, sin relaciones inversas."""
+    author = User(id=1, username="bench", email="bench@example.com", hashed_password="x", password_reminder="benchmark")
+    tags = [Tag(id=i, name=f"tag{i}") for i in range(1, 6)]
+    posts = []
+    for i in range(1, count + 1):
+        post = Post(
+            id=i, title=f"Benchmark post {i}", content="lorem ipsum " * 80, is_published=True,
+            created_at=datetime(2024, 1, 1), author_id=1, rating_count=3, rating_sum=12.0,
+        )
+        set_committed_value(post, "author", author)
+        set_committed_value(post, "tags", tags[: i % 5 + 1])
+        posts.append(post)
+    return posts
+
+
+def encode_before(posts) -> bytes:
+    serialized_posts = []
+    for post in posts:
+        serialized_post = jsonable_encoder(post)
+        serialized_post["author"] = jsonable_encoder(post.author)
+        serialized_post["tags"] = jsonable_encoder(post.tags)
+        serialized_post["average_rating"] = post.average_rating
+        serialized_post["user_rating"] = 4.0
+        serialized_posts.append(serialized_post)
+    result = {"total": None, "page": 1, "size": len(posts), "next_cursor": None, "posts": serialized_posts}
+    # FastAPI con response_model=dict: vuelve a recorrer el dict y lo codifica con json.dumps
+    return JSONResponse(jsonable_encoder(result)).body
+
+
+def encode_after(posts) -> bytes:
+    items = []
+    for post in posts:
+        item = PostListItem.model_validate(post)
+        item.user_rating = 4.0
+        items.append(item)
+    result = PostListResponse(total=None, page=1, size=len(posts), next_cursor=None, posts=items)
+    return FastJSONResponse(result).body
+
+
+def measure(func, posts, repeat: int) -> dict:
+    func(posts)  # calentamiento
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = func(posts)
+        timings.append(time.perf_counter() - start)
+    return {
+        "mean_ms": round(statistics.mean(timings) * 1000, 3),
+        "p50_ms": round(statistics.median(timings) * 1000, 3),
+        "bytes": len(body),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    posts = build_posts(args.posts)
+    before = measure(encode_before, posts, args.repeat)
+    after = measure(encode_after, posts, args.repeat)
+    print(json.dumps({
+        "posts": args.posts,
+        "jsonable_encoder": before,
+        "pydantic": after,
+        "speedup": round(before["mean_ms"] / after["mean_ms"], 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Fixtures comunes: la app contra una base SQLite temporal (sin PostgreSQL).
+
+DATABASE_URL se fija antes de importar la app, porque los motores se crean al importar
+``app.database``. El esquema se crea una vez por sesión de pytest; cada test trabaja
+con usuarios, etiquetas y posts propios (nombres únicos), así no depende del orden.
+"""
+import itertools
+import os
+import tempfile
+
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix="blog-tests-"), "test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ.setdefault("PASSWORD_BCRYPT_ROUNDS", "4")  # bcrypt mínimo: los tests no miden coste
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app import models  # noqa: E402,F401
+from app.database import Base, engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+PASSWORD = "TestPassw0rd"
+
+_names = itertools.count(1)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    Base.metadata.create_all(engine)
+    yield
+    engine.dispose()
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def unique(prefix: str) -> str:
+    return f"{prefix}{next(_names)}"
+
+
+@pytest.fixture
+def make_user(client):
+    """Registra un usuario y devuelve su id y las cabeceras con su token."""
+    def _make_user():
+        username = unique("tester")
+        response = client.post("/users/users", json={
+            "username": username, "email": f"{username}@example.com",
+            "password": PASSWORD, "password_reminder": "test reminder",
+        })
+        assert response.status_code == 200, response.text
+        login = client.post("/auth/login", data={"username": username, "password": PASSWORD})
+        assert login.status_code == 200, login.text
+        return {"id": response.json()["id"], "headers": {"Authorization": f"Bearer {login.json()['access_token']}"}}
+    return _make_user
+
+
+@pytest.fixture
+def user(make_user):
+    return make_user()
+
+
+@pytest.fixture
+def make_post(client):
+    """Crea un post del usuario (publicado por defecto) y lo devuelve tal como lo sirve la API."""
+    def _make_post(owner, published=True, **fields):
+        body = {"title": unique("Post "), "content": "content long enough for validation", "author_id": owner["id"]}
+        body.update(fields)
+        response = client.post("/posts/posts", json=body, headers=owner["headers"])
+        assert response.status_code == 200, response.text
+        post = response.json()
+        if published:
+            response = client.patch(f"/posts/posts/{post['id']}/publish?publish=true", headers=owner["headers"])
+            assert response.status_code == 200, response.text
+            post = response.json()
+        return post
+    return _make_post
@@ -0,0 +1,68 @@
+"""Errores por fila en /posts/bulk y /ratings/bulk cuando la base rechaza una sola fila."""
+from contextlib import contextmanager
+
+from sqlalchemy import func, select, text
+
+from app.database import SessionLocal, engine
+from app.models import Post, Rating
+
+from tests.conftest import unique
+
+
+@contextmanager
+def _rejecting_trigger(table, condition):
+    """Trigger de SQLite que aborta el INSERT que cumpla ``condition`` (IntegrityError)."""
+    name = unique("reject_")
+    with engine.begin() as connection:
+        connection.execute(text(
+            f"CREATE TRIGGER {name} BEFORE INSERT ON {table} WHEN {condition} "
+            "BEGIN SELECT RAISE(ABORT, 'rejected by test trigger'); END"
+        ))
+    try:
+        yield
+    finally:
+        with engine.begin() as connection:
+            connection.execute(text(f"DROP TRIGGER {name}"))
+
+
+def _post_row(user, title):
+    return {"title": title, "content": "content long enough for validation", "author_id": user["id"], "is_published": True}
+
+
+def test_bulk_posts_report_only_the_rejected_row(client, user):
+    rejected = unique("Rejected title ")
+    rows = [_post_row(user, unique("Bulk ok ")) for _ in range(4)]
+    rows.insert(2, _post_row(user, rejected))
+
+    with _rejecting_trigger("posts", f"NEW.title = '{rejected}'"):
+        response = client.post("/posts/bulk", json=rows, headers=user["headers"])
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert (body["received"], body["accepted"], body["failed"]) == (5, 4, 1)
+    assert body["errors"][0]["index"] == 2 and "rejected by test trigger" in body["errors"][0]["errors"][0]["msg"]
+    with SessionLocal() as db:
+        titles = set(db.execute(select(Post.title).where(Post.author_id == user["id"])).scalars())
+    assert titles == {row["title"] for row in rows} - {rejected}
+
+
+def test_bulk_ratings_report_only_the_rejected_row(client, user, make_user, make_post):
+    posts = [make_post(user) for _ in range(3)]
+    rater = make_user()
+    rows = [{"post_id": post["id"], "rating": 4} for post in posts]
+    rows.append({"post_id": 10 ** 9, "rating": 3})  # no existe: error propio de la ruta
+
+    with _rejecting_trigger("ratings", f"NEW.post_id = {posts[1]['id']}"):
+        response = client.post("/ratings/bulk", json=rows, headers=rater["headers"])
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert (body["received"], body["accepted"], body["failed"]) == (4, 2, 2)
+    assert [error["index"] for error in body["errors"]] == [1, 3]
+    assert body["errors"][1]["errors"] == [{"msg": "Post not found"}]
+
+    with SessionLocal() as db:
+        for post, expected in zip(posts, (1, 0, 1)):
+            count = db.execute(select(func.count()).where(Rating.post_id == post["id"])).scalar()
+            stored = db.get(Post, post["id"])
+            assert count == stored.rating_count == expected
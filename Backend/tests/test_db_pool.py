@@ -0,0 +1,62 @@
+"""Contadores de InstrumentedQueuePool (/stats/db-pool) sobre un motor aiosqlite propio."""
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import event, exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app import database
+from app.database import InstrumentedQueuePool, PoolStats
+
+from tests.conftest import DB_PATH
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    stats = PoolStats()
+    monkeypatch.setattr(database, "pool_stats", stats)
+    return stats
+
+
+def _engine(**pool_args):
+    return create_async_engine(f"sqlite+aiosqlite:///{DB_PATH}", poolclass=InstrumentedQueuePool, **pool_args)
+
+
+def test_timeout_counts_one_checkout_attempt_and_the_queue_wait(stats):
+    async def scenario():
+        engine = _engine(pool_size=1, max_overflow=0, pool_timeout=0.2)
+        try:
+            async with engine.connect() as first:
+                await first.execute(text("SELECT 1"))
+                with pytest.raises(exc.TimeoutError):
+                    async with engine.connect():
+                        pass
+        finally:
+            await engine.dispose()
+
+    asyncio.run(scenario())
+    assert stats.checkouts == 1
+    assert stats.timeouts == 1
+    assert 0.15 <= stats.wait_max < 1.0
+
+
+def test_opening_an_overflow_connection_is_not_queue_wait(stats):
+    async def scenario():
+        engine = _engine(pool_size=1, max_overflow=1, pool_timeout=5)
+
+        @event.listens_for(engine.sync_engine, "connect")
+        def slow_connect(dbapi_connection, connection_record):
+            time.sleep(0.2)  # conexión nueva lenta (red, TLS, autenticación)
+
+        try:
+            async with engine.connect() as first, engine.connect() as second:
+                await first.execute(text("SELECT 1"))
+                await second.execute(text("SELECT 1"))
+        finally:
+            await engine.dispose()
+
+    asyncio.run(scenario())
+    assert stats.checkouts == 2
+    assert stats.overflow_connections == 1
+    assert stats.wait_max < 0.1
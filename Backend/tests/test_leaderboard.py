@@ -0,0 +1,169 @@
+import asyncio
+import heapq
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.exc import OperationalError
+
+from app import leaderboard
+from app.database import SessionLocal, engine
+from app.main import app
+from app.models import Post, Rating
+
+
+def _rate_posts(client, make_user, posts, values):
+    for post, post_values in zip(posts, values):
+        for value in post_values:
+            rater = make_user()
+            response = client.post("/ratings/ratings", json={"post_id": post["id"], "rating": value}, headers=rater["headers"])
+            assert response.status_code == 200, response.text
+
+
+def _expected_scores():
+    """Rankings completos calculados en Python, como hacía el refresco antes de ORDER BY ... LIMIT."""
+    window_start = datetime.utcnow() - timedelta(days=leaderboard.LEADERBOARD_TRENDING_DAYS)
+    with SessionLocal() as db:
+        posts = db.execute(
+            select(Post.id, Post.rating_count, Post.rating_sum).where(Post.is_published == True, Post.rating_count > 0)  # noqa: E712
+        ).all()
+        ratings = db.execute(
+            select(Rating.post_id, Rating.rating, Rating.rated_at)
+            .join(Post, Post.id == Rating.post_id)
+            .where(Post.is_published == True, Rating.rated_at >= window_start)  # noqa: E712
+        ).all()
+    top = {post_id: leaderboard.bayesian_score(count, total) for post_id, count, total in posts}
+    trending = {}
+    for post_id, rating, rated_at in ratings:
+        trending[post_id] = trending.get(post_id, 0.0) + rating * leaderboard._decay_weight(rated_at)
+    return top, trending
+
+
+def _best(scores, n):
+    return [post_id for post_id, _ in heapq.nlargest(n, scores.items(), key=lambda item: (item[1], -item[0]))]
+
+
+def test_refresh_loads_only_the_best_candidates(client, user, make_user, make_post, monkeypatch):
+    monkeypatch.setattr(leaderboard, "top_rated", leaderboard.Leaderboard(size=2))
+    monkeypatch.setattr(leaderboard, "trending", leaderboard.Leaderboard(size=2))
+    posts = [make_post(user) for _ in range(6)]
+    _rate_posts(client, make_user, posts, [[5, 5, 5], [1], [4, 3], [2, 2], [5], [3, 4, 5]])
+
+    asyncio.run(leaderboard.refresh())
+
+    top, trending = _expected_scores()
+    capacity = leaderboard.top_rated.capacity
+    assert len(leaderboard.top_rated) == min(capacity, len(top))
+    assert [post_id for post_id, _ in leaderboard.top_rated.top(2)] == _best(top, 2)
+    for post_id, score in leaderboard.top_rated.top(capacity):
+        assert abs(score - top[post_id]) < 1e-9
+
+    assert len(leaderboard.trending) == min(capacity, len(trending))
+    assert [post_id for post_id, _ in leaderboard.trending.top(2)] == _best(trending, 2)
+    for post_id, score in leaderboard.trending.top(capacity):
+        assert abs(score - trending[post_id]) < 1e-6 * max(1.0, trending[post_id])
+
+
+def test_concurrent_first_loads_refresh_once(monkeypatch):
+    calls = []
+    refresh = leaderboard._refresh
+
+    async def counting_refresh():
+        calls.append(1)
+        await asyncio.sleep(0.01)  # cede el bucle: las demás peticiones llegan durante el refresco
+        await refresh()
+
+    async def first_requests():
+        # Lock nuevo en el bucle de este test
+        monkeypatch.setattr(leaderboard.state, "refresh_lock", None)
+        monkeypatch.setattr(leaderboard.state, "refreshed_at", None)
+        await asyncio.gather(*(leaderboard.ensure_loaded() for _ in range(5)))
+
+    monkeypatch.setattr(leaderboard, "_refresh", counting_refresh)
+    asyncio.run(first_requests())
+    assert len(calls) == 1
+    assert leaderboard.state.refreshed_at is not None
+
+
+class _InterleavingSession:
+    """Sesión que ejecuta ``hook`` justo antes de la sentencia número ``before``."""
+
+    def __init__(self, db, before, hook):
+        self.db, self.before, self.hook, self.calls = db, before, hook, 0
+
+    async def execute(self, *args, **kwargs):
+        self.calls += 1
+        if self.calls == self.before:
+            await self.hook()
+        return await self.db.execute(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.db, name)
+
+
+def test_rating_during_refresh_survives_replace(client, user, make_user, make_post, monkeypatch):
+    monkeypatch.setattr(leaderboard, "top_rated", leaderboard.Leaderboard())
+    monkeypatch.setattr(leaderboard, "trending", leaderboard.Leaderboard())
+    post = make_post(user)
+    _rate_posts(client, make_user, [post], [[2, 2]])
+    late_rater = make_user()
+
+    async def rate_during_refresh():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as api:
+            response = await api.post(
+                "/ratings/ratings", json={"post_id": post["id"], "rating": 5}, headers=late_rater["headers"]
+            )
+        assert response.status_code == 200, response.text
+
+    read_session = leaderboard.read_session
+
+    @asynccontextmanager
+    async def interleaved_session():
+        async with read_session() as db:
+            # Después de la consulta del top y antes de la de trending (rankings viejos, t0 viejo)
+            yield _InterleavingSession(db, before=3, hook=rate_during_refresh)
+
+    monkeypatch.setattr(leaderboard, "read_session", interleaved_session)
+    asyncio.run(leaderboard.refresh())
+
+    top, trending = _expected_scores()
+    assert abs(leaderboard.top_rated.scores[post["id"]] - top[post["id"]]) < 1e-9
+    assert abs(leaderboard.trending.scores[post["id"]] - trending[post["id"]]) < 1e-6 * trending[post["id"]]
+    assert leaderboard.state.touched is None
+
+
+def test_failed_first_load_serves_empty_rankings_without_retrying_each_request(client, user, monkeypatch):
+    calls = []
+
+    async def failing_refresh():
+        calls.append(1)
+        raise RuntimeError("no such function: power")
+
+    monkeypatch.setattr(leaderboard, "_refresh", failing_refresh)
+    monkeypatch.setattr(leaderboard.state, "refresh_lock", None)
+    monkeypatch.setattr(leaderboard.state, "refreshed_at", None)
+    monkeypatch.setattr(leaderboard.state, "failed_at", None)
+    monkeypatch.setattr(leaderboard, "top_rated", leaderboard.Leaderboard())
+    monkeypatch.setattr(leaderboard, "trending", leaderboard.Leaderboard())
+
+    for url in ("/posts/top", "/posts/trending", "/posts/top"):
+        response = client.get(url, headers=user["headers"])
+        assert response.status_code == 200, response.text
+        assert response.json()["posts"] == []
+    assert len(calls) == 1
+
+
+def test_sqlite_connections_register_power():
+    assert _scalar("SELECT power(2.0, -1.0)") == 0.5
+    # math.pow falla con base negativa y exponente fraccionario (la nativa de SQLite
+    # devolvería NULL): así se comprueba que es la función registrada por app.database
+    with pytest.raises(OperationalError, match="user-defined function"):
+        _scalar("SELECT power(-8.0, 0.5)")
+
+
+def _scalar(sql):
+    with engine.connect() as connection:
+        return connection.execute(text(sql)).scalar()
@@ -0,0 +1,56 @@
+import pytest
+from fastapi.testclient import TestClient
+from passlib.context import CryptContext
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import SessionLocal
+from app.main import app
+from app.models import User
+from app.passwords import PASSWORD_BCRYPT_ROUNDS, password_stats
+
+from tests.conftest import PASSWORD, unique
+
+# Hash guardado con otro coste: el login correcto lo reescribe
+_OTHER_COST = CryptContext(schemes=["bcrypt"], bcrypt__rounds=PASSWORD_BCRYPT_ROUNDS + 1)
+
+
+@pytest.fixture
+def user_with_old_hash(client):
+    username = unique("rehash")
+    response = client.post("/users/users", json={
+        "username": username, "email": f"{username}@example.com",
+        "password": PASSWORD, "password_reminder": "test reminder",
+    })
+    assert response.status_code == 200, response.text
+    with SessionLocal() as db:
+        user = db.get(User, response.json()["id"])
+        user.hashed_password = _OTHER_COST.hash(PASSWORD)
+        db.commit()
+    return response.json()
+
+
+def _stored_hash(user_id):
+    with SessionLocal() as db:
+        return db.get(User, user_id).hashed_password
+
+
+def test_login_rehash_is_counted_after_commit(client, user_with_old_hash):
+    before = password_stats.rehashed
+    response = client.post("/auth/login", data={"username": user_with_old_hash["username"], "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    assert password_stats.rehashed == before + 1
+    assert f"$2b${PASSWORD_BCRYPT_ROUNDS:02d}$" in _stored_hash(user_with_old_hash["id"])
+
+
+def test_failed_rehash_commit_is_not_counted(user_with_old_hash, monkeypatch):
+    async def failing_commit(self):
+        raise RuntimeError("commit failed")
+
+    monkeypatch.setattr(AsyncSession, "commit", failing_commit)
+    before = password_stats.rehashed
+    old_hash = _stored_hash(user_with_old_hash["id"])
+    client = TestClient(app, raise_server_exceptions=False)
+    response = client.post("/auth/login", data={"username": user_with_old_hash["username"], "password": PASSWORD})
+    assert response.status_code == 500
+    assert password_stats.rehashed == before
+    assert _stored_hash(user_with_old_hash["id"]) == old_hash
@@ -0,0 +1,58 @@
+from app.profiler import assert_max_queries
+
+
+def _bulk_posts(client, owner, count):
+    rows = [
+        {
+            "title": f"Bulk post {i}", "content": "content long enough for validation",
+            "author_id": owner["id"], "tag_names": ["queries", f"queries{i % 3}"], "is_published": True,
+        }
+        for i in range(count)
+    ]
+    response = client.post("/posts/bulk", json=rows, headers=owner["headers"])
+    assert response.status_code == 200 and response.json()["accepted"] == count, response.text
+
+
+def _count_statements(client, url, headers):
+    with assert_max_queries(50) as statements:
+        response = client.get(url, headers=headers)
+    assert response.status_code == 200, response.text
+    return len(statements), response.json()
+
+
+def test_listing_statement_count_does_not_grow_with_page_size(client, user, make_user):
+    _bulk_posts(client, user, 60)
+    rater = make_user()
+    listing = client.get(f"/posts/posts?author_id={user['id']}&size=50", headers=rater["headers"]).json()
+    for post in listing["posts"][:20]:
+        response = client.post("/ratings/ratings", json={"post_id": post["id"], "rating": 4}, headers=rater["headers"])
+        assert response.status_code == 200, response.text
+
+    small, small_page = _count_statements(client, f"/posts/posts?author_id={user['id']}&size=5", rater["headers"])
+    large, large_page = _count_statements(client, f"/posts/posts?author_id={user['id']}&size=50", rater["headers"])
+
+    assert len(small_page["posts"]) == 5 and len(large_page["posts"]) == 50
+    assert any(post["user_rating"] == 4.0 for post in large_page["posts"])
+    assert small == large
+
+
+def test_summary_listing_statement_count_does_not_grow_with_page_size(client, user):
+    _bulk_posts(client, user, 60)
+    small, _ = _count_statements(client, f"/posts/posts?author_id={user['id']}&size=5&view=summary", user["headers"])
+    large, _ = _count_statements(client, f"/posts/posts?author_id={user['id']}&size=50&view=summary", user["headers"])
+    assert small == large
+
+
+def test_cursor_pages_skip_the_total_unless_requested(client, user):
+    _bulk_posts(client, user, 12)
+    url = f"/posts/posts?author_id={user['id']}&size=5"
+    first = client.get(url, headers=user["headers"]).json()
+    assert first["total"] == 12 and first["next_cursor"]
+
+    next_url = f"{url}&cursor={first['next_cursor']}"
+    small, page = _count_statements(client, next_url, user["headers"])
+    assert page["total"] is None and len(page["posts"]) == 5
+
+    counted, page = _count_statements(client, f"{next_url}&include_total=true", user["headers"])
+    assert page["total"] == 12
+    assert counted == small + 1
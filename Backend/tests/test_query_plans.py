@@ -0,0 +1,56 @@
+"""Planes de SQLite (EXPLAIN QUERY PLAN) de las consultas del listado de posts."""
+import pytest
+from sqlalchemy import event
+
+from app.database import async_engine, engine
+
+from tests.conftest import unique
+
+
+def _captured_statements(client, url, headers):
+    """Ejecuta la petición y devuelve las sentencias SQL con sus parámetros."""
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", _record)
+    try:
+        response = client.get(url, headers=headers)
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", _record)
+    assert response.status_code == 200, response.text
+    return statements
+
+
+def _query_plan(statement, parameters):
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", tuple(parameters)).all()
+    return [row[-1] for row in rows]
+
+
+@pytest.mark.parametrize("query", ["tag_name={first}", "tags={first},{second}&match=all"])
+def test_tag_filter_uses_post_tags_index(client, user, query):
+    first, second = unique("plantag"), unique("plantag")
+    rows = [
+        {
+            "title": f"Plan post {i}", "content": "content long enough for validation", "author_id": user["id"],
+            "tag_names": [first, second] if i % 2 else [first], "is_published": True,
+        }
+        for i in range(10)
+    ]
+    assert client.post("/posts/bulk", json=rows, headers=user["headers"]).status_code == 200
+
+    url = "/posts/posts?size=5&" + query.format(first=first, second=second)
+    filtered = [
+        (statement, parameters)
+        for statement, parameters in _captured_statements(client, url, user["headers"])
+        if "post_tags.tag_id IN" in statement
+    ]
+    assert filtered, "no se ejecutó el listado filtrado por etiquetas"
+
+    for statement, parameters in filtered:
+        plan = _query_plan(statement, parameters)
+        details = "\n".join(plan)
+        assert any("ix_post_tags_tag_id_post_id" in detail for detail in plan), details
+        assert not any(detail.startswith("SCAN post_tags") for detail in plan), details
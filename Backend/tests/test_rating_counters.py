@@ -0,0 +1,38 @@
+from app.profiler import assert_max_queries
+
+
+def _rate(client, rater, post_id, value):
+    response = client.post("/ratings/ratings", json={"post_id": post_id, "rating": value}, headers=rater["headers"])
+    assert response.status_code == 200, response.text
+
+
+def _updates_of_posts(statements):
+    return [statement for statement in statements if statement.lstrip().upper().startswith("UPDATE POSTS")]
+
+
+def test_deleting_a_rated_post_does_not_update_its_counters(client, user, make_user, make_post):
+    post = make_post(user)
+    for _ in range(6):
+        _rate(client, make_user(), post["id"], 4)
+
+    with assert_max_queries(30) as statements:
+        response = client.delete(f"/posts/posts/{post['id']}", headers=user["headers"])
+    assert response.status_code == 200, response.text
+    assert _updates_of_posts(statements) == []
+
+
+def test_deleting_a_rater_updates_counters_in_one_statement(client, user, make_user, make_post):
+    posts = [make_post(user) for _ in range(6)]
+    rater, other = make_user(), make_user()
+    for post in posts:
+        _rate(client, rater, post["id"], 5)
+        _rate(client, other, post["id"], 3)
+
+    with assert_max_queries(30) as statements:
+        response = client.delete(f"/users/users/{rater['id']}")
+    assert response.status_code == 200, response.text
+    assert len(_updates_of_posts(statements)) == 1
+
+    for post in posts:
+        body = client.get(f"/posts/posts/{post['id']}", headers=other["headers"]).json()
+        assert body["average_rating"] == 3.0
@@ -0,0 +1,42 @@
+"""Doble clic: envíos simultáneos de la misma calificación (usuario, post)."""
+import asyncio
+
+import httpx
+from sqlalchemy import func, select
+
+from app.database import SessionLocal
+from app.main import app
+from app.models import Post, Rating
+
+
+async def _submit_concurrently(headers, post_id, values):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await asyncio.gather(*(
+            client.post("/ratings/ratings", json={"post_id": post_id, "rating": value}, headers=headers)
+            for value in values
+        ))
+
+
+def test_concurrent_duplicate_submits_keep_one_row_and_exact_counters(client, user, make_user, make_post):
+    post = make_post(user)
+    rater, other = make_user(), make_user()
+    response = client.post("/ratings/ratings", json={"post_id": post["id"], "rating": 2}, headers=other["headers"])
+    assert response.status_code == 200, response.text
+
+    values = [5, 4, 5, 3, 5, 4]
+    responses = asyncio.run(_submit_concurrently(rater["headers"], post["id"], values))
+    assert [response.status_code for response in responses] == [200] * len(values), [r.text for r in responses]
+
+    with SessionLocal() as db:
+        rows = db.execute(
+            select(func.count(), func.sum(Rating.rating)).where(Rating.post_id == post["id"], Rating.user_id == rater["id"])
+        ).one()
+        actual_count, actual_sum = db.execute(
+            select(func.count(), func.sum(Rating.rating)).where(Rating.post_id == post["id"])
+        ).one()
+        stored = db.get(Post, post["id"])
+
+    assert rows[0] == 1 and rows[1] in values
+    assert stored.rating_count == actual_count == 2
+    assert stored.rating_sum == actual_sum
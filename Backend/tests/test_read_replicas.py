@@ -0,0 +1,98 @@
+"""Una réplica retrasada no debe reponer en la caché de respuestas datos ya invalidados."""
+import os
+import shutil
+import time
+
+import pytest
+
+from app import database, response_cache
+from app.profiler import assert_max_queries
+
+from tests.conftest import DB_PATH, unique
+
+
+@pytest.fixture
+def lagging_replica(monkeypatch):
+    """Réplica SQLite que se queda con la copia del primario hecha al llamar a ``sync()``."""
+    path = os.path.join(os.path.dirname(DB_PATH), "replica.db")
+    replicas = database.ReadReplicas([f"sqlite:///{path}"])
+
+    def sync():
+        shutil.copyfile(DB_PATH, path)
+
+    sync()
+    monkeypatch.setattr(database, "read_replicas", replicas)
+    monkeypatch.setattr(database, "recent_writers", database.TTLCache(maxsize=100, ttl=60))
+    yield sync
+    for engine in replicas.engines:
+        engine.sync_engine.dispose()
+
+
+def _forget_recent_commits(monkeypatch):
+    """Como si la última escritura fuera más antigua que DB_READ_YOUR_WRITES_SECONDS."""
+    monkeypatch.setattr(database, "_last_commit_at", time.monotonic() - database.DB_READ_YOUR_WRITES_SECONDS - 1)
+
+
+def test_replica_read_after_write_does_not_refill_post_cache(client, user, make_user, make_post, lagging_replica, monkeypatch):
+    post = make_post(user)
+    reader = make_user()
+    url = f"/posts/posts/{post['id']}"
+    key = response_cache.post_key(post["id"])
+    lagging_replica()
+    _forget_recent_commits(monkeypatch)
+
+    assert client.get(url, headers=reader["headers"]).json()["title"] == post["title"]
+    assert response_cache.get_cached(key) is not None  # réplica al día: se cachea
+
+    title = unique("Updated title ")
+    response = client.put(url, json={
+        "title": title, "content": post["content"], "is_published": True, "author_id": user["id"],
+    }, headers=user["headers"])
+    assert response.status_code == 200, response.text
+
+    # La réplica aún no tiene la actualización: el lector la ve vieja, pero no se cachea
+    assert client.get(url, headers=reader["headers"]).json()["title"] == post["title"]
+    assert response_cache.get_cached(key) is None
+
+    # El autor está en su ventana read-your-writes: primario y sin pasar por la caché
+    response_cache.store(key, b'{"stale": true}', response_cache.current_epoch())
+    assert client.get(url, headers=user["headers"]).json()["title"] == title
+    assert response_cache.get_cached(key).body == b'{"stale": true}'
+    response_cache.invalidate(key)
+
+
+def test_replica_read_after_write_does_not_refill_tag_caches(client, user, make_post, lagging_replica, monkeypatch):
+    _forget_recent_commits(monkeypatch)
+    client.get("/tags/tags")
+    client.get("/tags/stats")
+    assert response_cache.get_cached(response_cache.TAGS_KEY) is not None
+
+    name = unique("replicatag")
+    assert client.post("/tags/tags", json={"name": name}).status_code == 200
+    make_post(user, tag_names=[name])
+
+    assert name not in [tag["name"] for tag in client.get("/tags/tags").json()]
+    assert name not in [tag["name"] for tag in client.get("/tags/stats").json()]
+    assert response_cache.get_cached(response_cache.TAGS_KEY) is None
+    assert response_cache.response_cache.get(response_cache.TAG_STATS_KEY) is None
+
+    # Réplica al día y sin escrituras recientes: vuelve a llenarse
+    lagging_replica()
+    _forget_recent_commits(monkeypatch)
+    assert name in [tag["name"] for tag in client.get("/tags/tags").json()]
+    assert name in [tag["name"] for tag in client.get("/tags/stats").json()]
+    assert response_cache.get_cached(response_cache.TAGS_KEY) is not None
+
+
+def test_query_assertions_count_replica_statements(client, user, make_user, make_post, lagging_replica):
+    post = make_post(user)
+    reader = make_user()
+    lagging_replica()
+    response_cache.invalidate(response_cache.post_key(post["id"]))
+    replica = database.read_replicas.engines[0]
+
+    with assert_max_queries(20) as every_engine, assert_max_queries(20, engine=replica) as on_replica:
+        response = client.get(f"/posts/posts/{post['id']}", headers=reader["headers"])
+    assert response.status_code == 200, response.text
+    assert on_replica, "la lectura no pasó por la réplica"
+    assert all(statement in every_engine for statement in on_replica)
@@ -0,0 +1,81 @@
+"""Cada escritura invalida la caché de respuestas: la lectura siguiente ve el cambio."""
+from app import response_cache
+
+from tests.conftest import unique
+
+
+def _get(client, url, headers=None):
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_create_tag_is_visible_in_cached_tag_list(client):
+    _get(client, "/tags/tags")  # calienta la caché
+    name = unique("cachetag")
+    assert client.post("/tags/tags", json={"name": name}).status_code == 200
+    assert name in [tag["name"] for tag in _get(client, "/tags/tags")]
+
+
+def test_update_post_is_visible_in_cached_post(client, user, make_post):
+    post = make_post(user)
+    url = f"/posts/posts/{post['id']}"
+    _get(client, url, user["headers"])
+
+    title = unique("Updated title ")
+    response = client.put(url, json={
+        "title": title, "content": post["content"], "is_published": True, "author_id": user["id"],
+    }, headers=user["headers"])
+    assert response.status_code == 200, response.text
+    assert _get(client, url, user["headers"])["title"] == title
+
+
+def test_toggle_publish_is_visible_in_cached_post(client, user, make_post):
+    post = make_post(user)
+    url = f"/posts/posts/{post['id']}"
+    assert _get(client, url, user["headers"])["is_published"] is True
+
+    response = client.patch(f"{url}/publish?publish=false", headers=user["headers"])
+    assert response.status_code == 200, response.text
+    assert _get(client, url, user["headers"])["is_published"] is False
+
+
+def test_delete_post_is_not_served_from_cache(client, user, make_post):
+    post = make_post(user)
+    url = f"/posts/posts/{post['id']}"
+    _get(client, url, user["headers"])
+
+    assert client.delete(url, headers=user["headers"]).status_code == 200
+    assert client.get(url, headers=user["headers"]).status_code == 404
+
+
+def test_rate_post_is_visible_in_cached_post(client, user, make_user, make_post):
+    post = make_post(user)
+    url = f"/posts/posts/{post['id']}"
+    assert _get(client, url, user["headers"])["average_rating"] == 0.0
+
+    rater = make_user()
+    response = client.post("/ratings/ratings", json={"post_id": post["id"], "rating": 4}, headers=rater["headers"])
+    assert response.status_code == 200, response.text
+    assert _get(client, url, user["headers"])["average_rating"] == 4.0
+
+
+def test_store_after_concurrent_invalidate_is_not_cached():
+    key = response_cache.post_key(-1)
+    epoch = response_cache.current_epoch()  # la lectura empieza
+    response_cache.invalidate(key)  # una escritura termina mientras tanto
+    response = response_cache.store(key, b'{"stale": true}', epoch)
+
+    assert response.body == b'{"stale": true}'  # la petición en curso sí recibe su lectura
+    assert response_cache.get_cached(key) is None
+
+    response_cache.store(key, b'{"fresh": true}', response_cache.current_epoch())
+    assert response_cache.get_cached(key).body == b'{"fresh": true}'
+    response_cache.invalidate(key)
+
+
+def test_store_value_after_concurrent_invalidate_is_not_cached():
+    epoch = response_cache.current_epoch()
+    response_cache.invalidate_all()
+    assert response_cache.store_value(response_cache.TAG_STATS_KEY, ["stale"], epoch) == ["stale"]
+    assert response_cache.response_cache.get(response_cache.TAG_STATS_KEY) is None
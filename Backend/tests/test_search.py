@@ -0,0 +1,17 @@
+from app import search
+
+from tests.conftest import unique
+
+
+def test_search_finds_matching_published_posts(client, user, make_post):
+    word = unique("searchword")
+    post = make_post(user, content=f"content about {word} long enough")
+    response = client.get(f"/posts/search?q={word}", headers=user["headers"])
+    assert response.status_code == 200, response.text
+    assert [item["id"] for item in response.json()["posts"]] == [post["id"]]
+
+
+def test_search_on_unsupported_database_returns_501(client, user, monkeypatch):
+    monkeypatch.setattr(search, "SUPPORTED_DIALECTS", ("postgresql",))
+    response = client.get("/posts/search?q=cloud", headers=user["headers"])
+    assert response.status_code == 501, response.text
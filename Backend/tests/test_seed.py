@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, select
+
+from app.database import Base
+from app.models import Rating
+from app.seed import generate
+
+
+def _seeded_ratings(tmp_path, name, **options):
+    engine = create_engine(f"sqlite:///{tmp_path / name}")
+    Base.metadata.create_all(engine)
+    try:
+        generate(users=20, tags=5, posts=30, ratings=120, seed=7, bind=engine, **options)
+        with engine.connect() as connection:
+            return connection.execute(
+                select(Rating.id, Rating.post_id, Rating.user_id, Rating.rating, Rating.rated_at).order_by(Rating.id)
+            ).all()
+    finally:
+        engine.dispose()
+
+
+def test_same_seed_generates_identical_ratings(tmp_path):
+    first = _seeded_ratings(tmp_path, "first.db")
+    second = _seeded_ratings(tmp_path, "second.db")
+    assert first and first == second
+
+
+def test_ratings_are_spread_before_the_reference_date(tmp_path):
+    reference = datetime(2025, 6, 1)
+    rows = _seeded_ratings(tmp_path, "spread.db", reference=reference, rating_days=30)
+    rated_at = [row.rated_at for row in rows]
+    assert all(reference - timedelta(days=30) <= value <= reference for value in rated_at)
+    assert max(rated_at) - min(rated_at) > timedelta(days=7)  # no caen todas en la ventana de trending
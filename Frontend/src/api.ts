@@ -103,36 +103,19 @@ export const fetchPublishedPosts = async (page = 1, size = 10) => {
 };
 
 
-// ✅ Fetch only the current user's drafts with pagination
+// ✅ Fetch only the current user's drafts with pagination (filtrado en el servidor)
 export const fetchUserDraftPosts = async (page = 1, size = 10) => {
   const token = localStorage.getItem("token");
-  const userId = getUserId();
 
   if (!token) throw new Error("User is not authenticated.");
 
   try {
-    const response = await api.get(`/posts/posts?page=${page}&size=${size}`, {
+    const response = await api.get(`/posts/me/drafts?page=${page}&size=${size}`, {
       headers: { Authorization: `Bearer ${token}` },
     });
 
-    console.log("Response posts:", response.data.posts);
-
-    // Filtrar borradores:
-    const drafts = response.data.posts.filter((post: any) => {
-      // Convertir el is_published a boolean:
-      const published = post.is_published === true || post.is_published === 'true' || post.is_published === 1;
-      const authorId = Number(post.author?.id);
-      console.log(`Post id: ${post.id} | authorId: ${authorId} | userId: ${userId} | published: ${published}`);
-      return authorId === userId && !published;
-    });
-
-    console.log("Draft posts fetched:", drafts);
-    return {
-      total: drafts.length,
-      page,
-      size,
-      posts: drafts,
-    };
+    console.log("Draft posts fetched:", response.data.posts);
+    return response.data;
   } catch (error) {
     console.error("❌ Failed to fetch draft posts:", error.response?.data || error);
     return { total: 0, page, size, posts: [] };